@@ -0,0 +1,196 @@
+import html
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import streamlit as st
+
+import data
+
+# Skor robust-z (modified z-score Iglewicz-Hoaglin) di atas ambang ini dianggap anomali
+THRESHOLD = 3.5
+# Banyak wilayah minimum dalam satu provinsi agar dibandingkan sesama provinsi;
+# provinsi yang lebih kecil dibandingkan dengan seluruh wilayah nasional
+MIN_PEERS = 5
+REALISED_STATUS = 'Realisasi'
+
+REGION_KEYS = ['Provinsi', 'Kabupaten/Kota']
+_SUMS = ['Investasi', 'Proyek', 'Terealisasi', 'Lat', 'Lon', 'Titik']
+_COLUMNS = REGION_KEYS + ['Status', 'Investasi', 'Lat', 'Lon']
+
+
+def robust_z(values, groups=None):
+    """Modified z-score 0.6745 * (x - median) / MAD, per kelompok bila `groups` diberikan.
+
+    Bila MAD bernilai 0 (lebih dari separuh nilai sama), dipakai simpangan rata-rata
+    absolut dengan faktor 0.7979 sebagai gantinya.
+    """
+    values = pd.Series(values, dtype=float)
+    grouped = values.groupby(groups if groups is not None else np.zeros(len(values)))
+    deviation = (values - grouped.transform('median')).abs()
+    by_deviation = deviation.groupby(grouped.ngroup().to_numpy())
+    mad = by_deviation.transform('median') / 0.6745
+    mean_ad = by_deviation.transform('mean') / 0.7979
+    scale = mad.where(mad > 0, mean_ad)
+    z = (values - grouped.transform('median')) / scale
+    return z.where(scale > 0, 0.0)
+
+
+class RegionProfile:
+    """Agregat per (Provinsi, Kabupaten/Kota) yang diperbarui bertahap.
+
+    Seperti data.RollupCube, hanya file Parquet baru yang dibaca; agregatnya
+    (jumlah investasi, banyak proyek, investasi berstatus Realisasi, jumlah
+    koordinat) cukup dijumlahkan. Skor anomali dihitung ulang dari agregat ini,
+    yang ukurannya sebanyak wilayah dan bukan sebanyak proyek, sekali per
+    perubahan data.
+    """
+
+    def __init__(self):
+        self._totals = pd.DataFrame(
+            np.empty((0, len(_SUMS))), columns=_SUMS,
+            index=pd.MultiIndex.from_tuples([], names=REGION_KEYS)
+        )
+        self._scores = None
+        self._files = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.sample = False
+
+    def add(self, table):
+        """Tambahkan satu batch proyek (pyarrow.Table berkolom _COLUMNS)."""
+        if table.num_rows == 0:
+            return
+        realised = pc.if_else(pc.equal(table['Status'], REALISED_STATUS), table['Investasi'], 0.0)
+        located = pc.and_(pc.is_valid(table['Lat']), pc.is_valid(table['Lon']))
+        table = table.append_column('Terealisasi', realised).append_column('Titik', pc.cast(located, 'int64'))
+        totals = table.group_by(REGION_KEYS).aggregate([
+            ('Investasi', 'sum'), ('Investasi', 'count'), ('Terealisasi', 'sum'),
+            ('Lat', 'sum'), ('Lon', 'sum'), ('Titik', 'sum'),
+        ]).to_pandas()
+        totals = totals.dropna(subset=REGION_KEYS).set_index(REGION_KEYS)
+        totals.columns = _SUMS
+        with self._lock:
+            self._totals = self._totals.add(totals.fillna(0), fill_value=0)
+            self._scores = None
+
+    def sync(self, dataset):
+        """Tambahkan file Parquet yang belum pernah masuk ke profil."""
+        if dataset is None:
+            return
+        with self._sync_lock:
+            new_files = [f for f in dataset.files if f not in self._files]
+            if new_files:
+                self.add(data.files_dataset(new_files).to_table(columns=_COLUMNS))
+                self._files.update(new_files)
+
+    def scores(self):
+        """DataFrame skor per wilayah; dihitung sekali per perubahan agregat."""
+        with self._lock:
+            if self._scores is None:
+                self._scores = _score(self._totals)
+            return self._scores
+
+
+def _score(totals):
+    regions = totals.reset_index()
+    if regions.empty:
+        return regions.assign(**{'Rasio Realisasi': [], 'Skor': [], 'Anomali': [], 'Alasan': []})
+    provinsi = regions['Provinsi']
+    peers = provinsi.map(provinsi.value_counts()) >= MIN_PEERS
+    groups = provinsi.where(peers, data.ALL)
+
+    ratio = regions['Terealisasi'] / regions['Investasi'].where(regions['Investasi'] > 0)
+    per_project = np.log1p(regions['Investasi'].clip(lower=0) / regions['Proyek'].where(regions['Proyek'] > 0))
+    z_ratio = robust_z(ratio.fillna(ratio.median()), groups)
+    z_size = robust_z(per_project.fillna(per_project.median()), groups)
+
+    reasons = pd.Series('', index=regions.index)
+    for z, label in ((z_ratio, 'rasio realisasi'), (z_size, 'nilai per proyek')):
+        high, low = z > THRESHOLD, z < -THRESHOLD
+        reasons[high] += f'{label} jauh di atas wilayah sebanding; '
+        reasons[low] += f'{label} jauh di bawah wilayah sebanding; '
+
+    regions['Rasio Realisasi'] = ratio
+    regions['Skor'] = np.maximum(z_ratio.abs(), z_size.abs())
+    regions['Anomali'] = regions['Skor'] > THRESHOLD
+    regions['Alasan'] = reasons.str.rstrip('; ')
+    regions['Lat'] = regions['Lat'] / regions['Titik'].where(regions['Titik'] > 0)
+    regions['Lon'] = regions['Lon'] / regions['Titik'].where(regions['Titik'] > 0)
+    return regions.drop(columns=['Terealisasi', 'Titik']).sort_values('Skor', ascending=False, ignore_index=True)
+
+
+def _sample_table():
+    import pyarrow as pa
+
+    sample = data.load_jateng_data().assign(Provinsi='Jawa Tengah')
+    return pa.Table.from_pandas(sample[_COLUMNS], preserve_index=False)
+
+
+@st.cache_resource(show_spinner=False)
+def _region_profile():
+    profile = RegionProfile()
+    if data.project_dataset() is None:
+        profile.add(_sample_table())
+        profile.sample = True
+    return profile
+
+
+def region_profile():
+    """Profil wilayah bersama untuk semua sesi, disinkronkan dengan penyimpanan Parquet."""
+    profile = _region_profile()
+    dataset = data.project_dataset()
+    if profile.sample and dataset is not None:
+        _region_profile.clear()
+        profile = _region_profile()
+    profile.sync(dataset)
+    return profile
+
+
+def region_anomalies(kabupaten=None):
+    """Wilayah yang ditandai anomali, terurut dari skor tertinggi.
+
+    `kabupaten` membatasi hasil ke Kabupaten/Kota tertentu (mis. dari query.Selection).
+    """
+    scores = region_profile().scores()
+    flagged = scores[scores['Anomali']]
+    if kabupaten is not None:
+        flagged = flagged[flagged['Kabupaten/Kota'].isin(kabupaten)]
+    return flagged.reset_index(drop=True)
+
+
+_RANGE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+def target_deviations(stats):
+    """Indikator utama yang berada di luar rentang targetnya.
+
+    Daftar (label, nilai, batas bawah, batas atas); target berupa teks bukan
+    rentang (mis. 'Target RKP 2024') dilewati.
+    """
+    result = []
+    for label, stat in stats.items():
+        match = _RANGE.match(str(stat.get('target', '')))
+        if match is None:
+            continue
+        low, high = sorted(map(float, match.groups()))
+        if not low <= stat['value'] <= high:
+            result.append((label, stat['value'], low, high))
+    return result
+
+
+def findings(stats, kabupaten=None, limit=3):
+    """Butir HTML (<li>) untuk kotak keterangan: indikator di luar target dan
+    hingga `limit` wilayah anomali teratas."""
+    items = [
+        f"<li><strong>{html.escape(label)}</strong> {value:g} di luar target {low:g} - {high:g}</li>"
+        for label, value, low, high in target_deviations(stats)
+    ]
+    items += [
+        f"<li>⚠️ <strong>{html.escape(row['Kabupaten/Kota'])}</strong> ({html.escape(row['Provinsi'])}): "
+        f"{html.escape(row['Alasan'])}</li>"
+        for _, row in region_anomalies(kabupaten).head(limit).iterrows()
+    ]
+    return items
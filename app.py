@@ -1,13 +1,21 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.figure_factory as ff
 from datetime import datetime
-import folium
-from streamlit_folium import st_folium
+import functools
+
+import anomaly
+import charts
+import data
+import export
+import forecast
+import geo
+import lifecycle
+import live
+import metrics
+import query
+import report
+import search
+import tiles
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -17,6 +25,12 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+REPORT_POLL_SECONDS = 2
+# Selang pemeriksaan ulang placeholder dataset yang belum selesai dimuat
+LOADING_POLL_SECONDS = 1
+# Banyak wilayah anomali yang disebut di kotak keterangan
+INSIGHT_ANOMALIES = 3
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -121,41 +135,274 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def render_report_status(key, polling):
+    queue = report.report_queue()
+    status = queue.status(key)
+    if polling and status in ("selesai", "gagal"):
+        # Laporan selesai: jalankan ulang halaman agar polling berhenti
+        st.rerun()
+    if status == "selesai":
+        st.download_button(
+            "📄 Unduh Laporan",
+            functools.partial(open, report.report_path(key), "rb"),
+            f"laporan_investasi_{key[:8]}.html",
+            "text/html",
+            on_click="ignore"
+        )
+    elif status == "gagal":
+        st.error(f"Laporan gagal dibuat: {queue.error(key)}")
+    else:
+        label = "sedang dibuat" if status == "diproses" else f"menunggu antrean ({queue.pending()} pekerjaan)"
+        st.info(f"⏳ Laporan {label}...")
+
+
+def render_loading(names):
+    if snapshot.ready(*names):
+        # Dataset sudah tersedia: jalankan ulang halaman agar bagiannya tampil
+        st.rerun()
+    st.status(f"Memuat data: {', '.join(names)}", state="running")
+
+
+def dataset_ready(*names):
+    """True bila dataset snapshot tersedia dalam batas waktunya.
+
+    Bila belum, tampilkan placeholder yang memeriksa ulang secara berkala
+    sehingga bagian lain halaman tidak ikut menunggu sumber yang lambat.
+    """
+    if snapshot.wait(*names):
+        return True
+    st.fragment(run_every=LOADING_POLL_SECONDS)(render_loading)(names)
+    return False
+
+
+@st.fragment(run_every=live.POLL_SECONDS)
+def render_live_status():
+    # Dijalankan ulang berkala; halaman hanya digambar ulang bila ada data baru
+    ingestor = live.live_ingestor()
+    seen = st.session_state.setdefault("live_version", ingestor.version)
+    if ingestor.version != seen:
+        st.session_state["live_version"] = ingestor.version
+        st.rerun()
+    if ingestor.last_error is not None:
+        st.warning(f"⚠️ Update Data: {ingestor.last_error}")
+    else:
+        st.success("✅ Update Data: Real-time")
+    st.info(f"🕐 Terakhir refresh: {datetime.now().strftime('%H:%M:%S')}")
+    if ingestor.last_update is not None:
+        st.caption(f"Data baru terakhir masuk: {ingestor.last_update.strftime('%H:%M:%S')}")
+
+
+def render_metrics_panel():
+    # Angka gabungan semua sesi yang mengaktifkan Mode Lanjutan di proses ini
+    with st.expander("⏱️ Instrumentasi"):
+        phases = metrics.recorder.phases()
+        if not phases:
+            st.caption("Belum ada pengukuran.")
+            return
+        st.dataframe(pd.DataFrame([
+            {
+                "Bagian": name,
+                "Fase": phase,
+                "Jumlah": stats['count'],
+                "Rata-rata (ms)": stats['total'] / stats['count'] * 1000,
+                "Terakhir (ms)": stats['last'] * 1000,
+                "Maks (ms)": stats['max'] * 1000,
+            }
+            for (name, phase), stats in sorted(phases.items())
+        ]), hide_index=True, use_container_width=True)
+
+        figures = metrics.recorder.figures()
+        if figures:
+            st.caption("Ukuran grafik yang dikirim ke browser")
+            st.dataframe(pd.DataFrame(
+                {"Grafik": list(figures), "Ukuran (KB)": [size / 1024 for size in figures.values()]}
+            ), hide_index=True, use_container_width=True)
+
+        load_seconds = snapshot.load_seconds()
+        if load_seconds:
+            st.caption("Pemuatan dataset snapshot (bersamaan)")
+            st.dataframe(pd.DataFrame(
+                {"Dataset": list(load_seconds), "Waktu (ms)": [s * 1000 for s in load_seconds.values()]}
+            ), hide_index=True, use_container_width=True)
+
+        memory = snapshot.memory_report()
+        if memory:
+            st.caption("Memori dataset snapshot: kolom teks seperti di sumber vs kategori dan angka bertipe")
+            st.dataframe(pd.DataFrame([
+                {
+                    "Dataset": name,
+                    "Sumber (KB)": sizes['sumber'] / 1024,
+                    "Ringkas (KB)": sizes['ringkas'] / 1024,
+                    "Hemat (%)": (1 - sizes['ringkas'] / sizes['sumber']) * 100 if sizes['sumber'] else None,
+                }
+                for name, sizes in memory.items()
+            ]), hide_index=True, use_container_width=True)
+
+        st.caption("Hit rate cache")
+        st.dataframe(pd.DataFrame([
+            {
+                "Cache": f"{name}: {entry}",
+                "Hit": stats['hits'],
+                "Miss": stats['misses'],
+                "Hit rate (%)": None if stats['hit_rate'] is None else stats['hit_rate'] * 100,
+            }
+            for (name, entry), stats in sorted(metrics.cache_stats().items())
+        ]), hide_index=True, use_container_width=True)
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.download_button("Prometheus", metrics.prometheus_text, "metrics.prom", "text/plain", on_click="ignore")
+        with col_b:
+            st.download_button("JSON lines", metrics.json_lines, "metrics.jsonl", "application/x-ndjson", on_click="ignore")
+        if st.button("Reset Pengukuran"):
+            metrics.recorder.reset()
+            st.rerun()
+
+
+# Sidebar untuk kontrol tambahan (dijalankan lebih dulu agar pilihan periode/wilayah
+# sudah tersedia sebelum grafik dibangun)
+with st.sidebar, metrics.section("sidebar"):
+    st.header("🎛️ Kontrol Dashboard")
+    
+    # Filter periode
+    periode = st.selectbox(
+        "Periode Data",
+        ["Bulanan", "Triwulanan", "Tahunan"],
+        index=2
+    )
+    
+    # Filter wilayah
+    wilayah_focus = st.multiselect(
+        "Fokus Wilayah",
+        ["Semarang", "Kendal", "Batang", "Pekalongan", "Pemalang"],
+        default=["Semarang", "Kendal", "Batang"]
+    )
+    
+    # Toggle advanced view
+    advanced_view = st.checkbox("Mode Lanjutan", value=False, key=metrics.SESSION_FLAG)
+    investment_threshold = None
+    
+    if advanced_view:
+        st.subheader("⚙️ Pengaturan Lanjutan")
+        
+        # Threshold settings
+        investment_threshold = st.slider(
+            "Ambang Batas Investasi (T)",
+            min_value=1.0,
+            max_value=100.0,
+            value=50.0,
+            step=5.0
+        )
+        
+        # Export options
+        st.subheader("📤 Export Data")
+        export_format = st.radio(
+            "Format Export",
+            ["CSV", "Excel", "PDF Report"]
+        )
+        
+        # File ekspor baru dibuat saat tombol diklik, di luar thread script,
+        # dengan filter wilayah dan ambang batas yang sedang dipilih
+        st.download_button(
+            "📥 Download Data",
+            functools.partial(export.export_file, export_format, query.DashboardFilter(wilayah_focus, investment_threshold)),
+            export.export_filename(export_format),
+            export.EXPORT_FORMATS[export_format][1],
+            on_click="ignore"
+        )
+    
+    # Status sistem
+    st.markdown("---")
+    st.markdown("**🔄 Status Sistem:**")
+    db_health = data.database_pool().health()
+    if not db_health['ok']:
+        st.error(f"❌ Koneksi Database: {db_health['error']}")
+    else:
+        db_detail = (f"{db_health['latency_ms']:.1f} ms, "
+                     f"{db_health['in_use']}/{db_health['size']} koneksi dipakai")
+        if db_health['saturation'] >= 0.8 or db_health['waiting']:
+            st.warning(f"⚠️ Koneksi Database: Sibuk ({db_detail})")
+        else:
+            st.success(f"✅ Koneksi Database: Normal ({db_detail})")
+    render_live_status()
+    
+    # Quick actions
+    st.markdown("**⚡ Quick Actions:**")
+    col_a, col_b = st.columns(2)
+    with col_a:
+        if st.button("🔄 Refresh"):
+            data.clear_cache()
+            data.publish_snapshot()
+            geo.map_index.clear()
+            query.clear_cache()
+            st.rerun()
+    with col_b:
+        if st.button("📊 Report"):
+            st.session_state["report_key"] = report.report_queue().submit(
+                periode, wilayah_focus, investment_threshold
+            )
+    
+    # Status laporan yang sedang/sudah dibuat
+    if "report_key" in st.session_state:
+        report_key = st.session_state["report_key"]
+        polling = report.report_queue().status(report_key) in ("antre", "diproses")
+        # Selama laporan diproses, hanya fragment status ini yang dijalankan ulang berkala
+        st.fragment(run_every=REPORT_POLL_SECONDS if polling else None)(render_report_status)(report_key, polling)
+
+# Snapshot data bersama untuk rerun ini: semua widget membaca versi yang sama,
+# langsung dari array read-only tanpa salinan per sesi. Dataset dimuat bersamaan
+# di latar; bagian yang datasetnya belum siap menampilkan placeholder (dataset_ready)
+snapshot = data.snapshot()
+
 # Header
 col1, col2 = st.columns([3, 1])
 with col1:
     st.markdown('<h1 class="main-header">Welcome to Dashboard</h1>', unsafe_allow_html=True)
 with col2:
     search_query = st.text_input("", placeholder="🔍 Search...")
+    
+    # Hasil pencarian membatasi peta, tabel proyek, dan grafik tren
+    search_result = None
+    if search_query.strip():
+        with metrics.section("pencarian"):
+            search_result = search.search_index(data.data_version()).match(search_query)
+        st.caption(f"{search_result['total']} hasil")
+        for doc in search_result['docs'][:5]:
+            st.caption(f"{doc['kind']}: {doc['label']}")
 
-# Data untuk statistik utama
-stats_data = {
-    'Laju Pertumbuhan Ekonomi': {'value': 4.95, 'change': -0.40, 'target': '5.30 - 6.60'},
-    'Tingkat Kemiskinan': {'value': 10.47, 'change': -2.79, 'target': '9.50 - 10.00'},
-    'Indeks Pembangunan Manusia': {'value': 73.88, 'change': 2.79, 'target': 'Target RKP 2024'},
-    'Tingkat Pengangguran Terbuka': {'value': 5.57, 'change': -2.79, 'target': '4.60 - 5.30'},
-    'Rasio Gini': {'value': 0.369, 'change': -2.79, 'target': 'Target RKP 2024'}
-}
+# Satu filter untuk semua widget (peta, tabel proyek, KPI, tren): pilihan sidebar
+# ditambah wilayah hasil pencarian, dievaluasi sekali sebelum grafik dibangun
+dashboard_filter = query.DashboardFilter(
+    wilayah_focus,
+    investment_threshold,
+    search_result['kabupaten'] if search_result and search_result['kabupaten'] else None
+)
+with metrics.section("filter"):
+    selection = query.select(dashboard_filter)
 
 # Menampilkan kartu statistik
 st.subheader("📈 Indikator Utama")
-cols = st.columns(5)
-for i, (label, data) in enumerate(stats_data.items()):
-    with cols[i]:
-        delta_color = "normal" if data['change'] > 0 else "inverse"
-        st.metric(
-            label=label,
-            value=f"{data['value']:.2f}" if data['value'] < 100 else f"{data['value']:.1f}",
-            delta=f"{data['change']:.2f}%",
-            delta_color=delta_color
-        )
-        st.caption(f"Target: {data['target']}")
+stats_data = snapshot.stats_data if dataset_ready('stats_data') else {}
+with metrics.section("indikator"):
+    cols = st.columns(5) if stats_data else []
+    for i, (label, stat) in enumerate(stats_data.items()):
+        with cols[i]:
+            delta_color = "normal" if stat['change'] > 0 else "inverse"
+            st.metric(
+                label=label,
+                value=f"{stat['value']:.2f}" if stat['value'] < 100 else f"{stat['value']:.1f}",
+                delta=f"{stat['change']:.2f}%",
+                delta_color=delta_color
+            )
+            st.caption(f"Target: {stat['target']}")
 
-# Tabs untuk kategori
-st.markdown('<div class="tab-container">', unsafe_allow_html=True)
-tab1, tab2, tab3, tab4 = st.tabs(["📚 Investasi", "🏥 Kesehatan", "🚌 Transportasi", "🏗️ Infrastruktur"])
+# Isi setiap tab adalah fragment tersendiri: interaksi di dalam satu tab hanya
+# menjalankan ulang tab tersebut, dan tab yang tidak aktif tidak dijalankan sama sekali
 
-with tab1:
+# Tab Investasi
+@st.fragment
+@metrics.timed("investasi")
+def render_investasi():
     # Layout utama dengan 3 kolom
     col1, col2, col3 = st.columns([2, 2, 1.5])
 
@@ -163,208 +410,103 @@ with tab1:
     with col1:
         st.markdown('<div class="section-title">📍 Peta Sebaran Investasi</div>', unsafe_allow_html=True)
         
-        # Data simulasi untuk peta Jawa Tengah
-        jateng_data = pd.DataFrame({
-            'Kabupaten/Kota': ['Semarang', 'Kendal', 'Batang', 'Pekalongan', 'Pemalang', 'Tegal', 'Brebes'],
-            'Status': ['Realisasi', 'Realisasi', 'Realisasi', 'Nasional Imajiner', 'Imajiner', 'Nasional Imajiner', 'Imajiner'],
-            'Investasi': [97.5, 96.3, 94.3, 87.2, 82.1, 78.5, 75.3],
-            'Lat': [-6.9667, -6.9167, -6.9042, -6.8889, -6.8917, -6.8694, -6.8717],
-            'Lon': [110.4167, 110.2042, 109.7292, 109.6753, 109.3842, 109.1403, 109.0428]
-        })
-        
-        # Buat peta dengan plotly
-        color_map = {
-            'Realisasi': '#38a169',      # Hijau
-            'Nasional Imajiner': '#e53e3e',  # Merah  
-            'Imajiner': '#3182ce'        # Biru
-        }
-        
-        fig_map = px.scatter_mapbox(
-            jateng_data,
-            lat="Lat",
-            lon="Lon",
-            color="Status",
-            size="Investasi",
-            hover_name="Kabupaten/Kota",
-            hover_data={"Investasi": ":.1f", "Status": True},
-            color_discrete_map=color_map,
-            size_max=20,
-            zoom=8,
-            center={"lat": -6.9, "lon": 110.0},
-            height=400,
-            mapbox_style="open-street-map"
-        )
+        # Peta dirender dalam fragment: mengubah zoom hanya menjalankan ulang bagian ini.
+        # Titik proyek dikelompokkan di server lewat indeks grid, sehingga yang dikirim
+        # ke browser hanya penanda teragregasi.
+        @st.fragment
+        @metrics.timed("peta")
+        def render_map():
+            zoom = st.select_slider("Tingkat Zoom", options=geo.ZOOM_LEVELS, value=8, key="map_zoom")
+            with metrics.phase(metrics.DATA):
+                index = geo.map_index()
+                bounds = geo.viewport(geo.MAP_CENTER, zoom)
+                markers = index.clusters(zoom, mask=selection.mask, bounds=bounds)
+                # Batas wilayah dengan tingkat detail sesuai zoom, dari file lokal
+                boundaries = tiles.boundary_level(zoom, bounds)
+                region_totals = index.region_totals(selection.mask) if boundaries is not None else None
+                anomalies = anomaly.region_anomalies(selection.kabupaten)
+            
+            fig_map = charts.map_figure(markers, zoom, geo.MAP_CENTER, boundaries, region_totals, anomalies)
+            st.plotly_chart(fig_map, use_container_width=True)
         
-        fig_map.update_layout(
-            margin={"r":0,"t":0,"l":0,"b":0},
-            legend=dict(
-                title="Legenda",
-                orientation="v",
-                yanchor="top",
-                y=1,
-                xanchor="left",
-                x=0.01,
-                bgcolor="rgba(255,255,255,0.8)"
-            )
-        )
-        st.plotly_chart(fig_map, use_container_width=True)
+        render_map()
         
         # ============= TREN REALISASI INVESTASI 2016-2024 =============
         st.markdown('<div class="section-title">📈 Tren Realisasi Investasi 2016-2024</div>', unsafe_allow_html=True)
         
-        years = list(range(2016, 2025))
-        trend_data = pd.DataFrame({
-            'Tahun': years,
-            'DK Jakarta': [8, 20, 18, 20, 18, 25, 15, 16, 25],
-            'Jabar': [15, 9, 8, 9, 10, 6, 4, 3, 18],
-            'Jateng': [20, 19, 19, 18, 6, 5, 5, 2, 8],
-            'DIY': [28, 28, 26, 25, 22, 20, 18, 16, 15]
-        })
-        
-        fig_trend = go.Figure()
-        colors = ['#38a169', '#3182ce', '#e53e3e', '#ed8936']
-        
-        for i, col in enumerate(['DK Jakarta', 'Jabar', 'Jateng', 'DIY']):
-            fig_trend.add_trace(go.Scatter(
-                x=trend_data['Tahun'],
-                y=trend_data[col],
-                mode='lines+markers',
-                name=col,
-                line=dict(color=colors[i], width=3),
-                marker=dict(size=6)
-            ))
-        
-        fig_trend.update_layout(
-            height=300,
-            xaxis_title="Tahun",
-            yaxis_title="Nilai (Triliun)",
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-            margin=dict(t=40)
-        )
-        st.plotly_chart(fig_trend, use_container_width=True)
+        with metrics.section("tren"):
+            with metrics.phase(metrics.DATA):
+                trend_data = data.cube_trend(periode, selection.kabupaten)
+                if search_result:
+                    matched = [c for c in trend_data.columns.drop('Periode') if c in search_result['provinsi']]
+                    if matched:
+                        trend_data = trend_data[['Periode'] + matched]
+                projection = forecast.trend_forecast(periode, trend_data.columns.drop('Periode'), selection.kabupaten)
+            fig_trend = charts.trend_figure(trend_data, projection)
+            st.plotly_chart(fig_trend, use_container_width=True)
 
         # Tambahan: Summary Stats
         st.markdown('<div class="section-title">📈 Ringkasan Bulan Ini</div>', unsafe_allow_html=True)
         
-        summary_cols = st.columns(2)
-        with summary_cols[0]:
-            st.markdown("""
-            <div class="info-box">
-                <div class="metric-title">Proyek Baru</div>
-                <div class="metric-value">47</div>
-                <div class="metric-delta">+12</div>
-            </div>
-            """, unsafe_allow_html=True)
-        with summary_cols[1]:
-            st.markdown("""
-            <div class="info-box">
-                <div class="metric-title">Investasi Baru</div>
-                <div class="metric-value">2.3T</div>
-                <div class="metric-delta">+0.8T</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
+        with metrics.section("ringkasan"):
+            summary_cols = st.columns(2)
+            for column, card in zip(summary_cols, lifecycle.summary_cards(selection.kabupaten)):
+                with column:
+                    st.markdown(f"""
+                    <div class="info-box">
+                        <div class="metric-title">{card['label']}</div>
+                        <div class="metric-value">{card['value']}</div>
+                        <div class="metric-delta">{card['delta']}</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
 
     # ============= KOLOM 2: DIAGRAM ALUR & TABEL =============
     with col2:
         # Diagram Alur Investasi
         st.markdown('<div class="section-title">🔄 Diagram Alur Investasi</div>', unsafe_allow_html=True)
         
-        # Membuat flowchart sederhana dengan plotly
-        fig_flow = go.Figure()
-        
-        # Kotak-kotak flowchart
-        boxes = [
-            {"text": "Identifikasi<br>Potensi", "x": 1, "y": 3, "color": "#38a169"},
-            {"text": "Realisasi<br>Proyek", "x": 3, "y": 3, "color": "#e53e3e"},
-            {"text": "Promosi", "x": 5, "y": 4, "color": "#38a169"},
-            {"text": "Redisasi<br>Proyek", "x": 5, "y": 3, "color": "#38a169"},
-            {"text": "Monitoring", "x": 5, "y": 2, "color": "#38a169"}
-        ]
-        
-        # Tambahkan shapes untuk kotak
-        shapes = []
-        annotations = []
-        
-        for box in boxes:
-            shapes.append(
-                dict(
-                    type="rect",
-                    x0=box["x"]-0.4, y0=box["y"]-0.3,
-                    x1=box["x"]+0.4, y1=box["y"]+0.3,
-                    fillcolor=box["color"],
-                    line=dict(color=box["color"], width=2),
-                    opacity=0.8
-                )
-            )
-            annotations.append(
-                dict(
-                    x=box["x"], y=box["y"],
-                    text=box["text"],
-                    showarrow=False,
-                    font=dict(color="white", size=10),
-                    align="center"
-                )
-            )
-        
-        # Tambahkan panah
-        shapes.extend([
-            # Panah dari Identifikasi ke Realisasi
-            dict(type="line", x0=1.4, y0=3, x1=2.6, y1=3, 
-                line=dict(color="gray", width=2)),
-            # Panah dari Realisasi ke Promosi/Redisasi/Monitoring
-            dict(type="line", x0=3.4, y0=3, x1=4.6, y1=3, 
-                line=dict(color="gray", width=2)),
-            # Panah vertikal ke Promosi dan Monitoring
-            dict(type="line", x0=4.6, y0=3, x1=4.6, y1=4, 
-                line=dict(color="gray", width=2)),
-            dict(type="line", x0=4.6, y0=3, x1=4.6, y1=2, 
-                line=dict(color="gray", width=2)),
-        ])
-        
-        fig_flow.update_layout(
-            shapes=shapes,
-            annotations=annotations,
-            xaxis=dict(range=[0, 6], showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(range=[1, 5], showgrid=False, zeroline=False, showticklabels=False),
-            height=200,
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(t=20, b=20, l=20, r=20)
-        )
-        
-        st.plotly_chart(fig_flow, use_container_width=True)
+        with metrics.section("alur"):
+            with metrics.phase(metrics.DATA):
+                stages = lifecycle.project_lifecycle().stage_table(selection.kabupaten)
+            fig_flow = charts.flow_figure(stages)
+            st.plotly_chart(fig_flow, use_container_width=True)
         
         # ============= DAFTAR INDIKASI PROYEK INVESTASI =============
         st.markdown('<div class="section-title">📋 Daftar Indikasi Proyek Investasi</div>', unsafe_allow_html=True)
         
-        project_table = pd.DataFrame({
-            'Kabupaten/Kota': ['Semarang', 'Kendal', 'Batang'],
-            'Nilai Indikator': [97.5, 96.3, 94.3],
-            'Ranking': [1, 2, 3],
-            'Realisasi (T)': ['85.5 T', '47.2 T', '38.4 T']
-        })
-        
-        # Style the dataframe
-        st.dataframe(
-            project_table,
-            use_container_width=True,
-            height=150,
-            hide_index=True
-        )
+        with metrics.section("tabel_proyek"):
+            if dataset_ready('project_table'):
+                with metrics.phase(metrics.DATA):
+                    project_table = lifecycle.project_table(snapshot.project_table, selection.kabupaten)
+        
+                # Style the dataframe
+                st.dataframe(
+                    project_table,
+                    use_container_width=True,
+                    height=150,
+                    hide_index=True,
+                    column_config={"Realisasi (T)": st.column_config.NumberColumn(format="%.1f T")}
+                )
         
 
         # ============= KETERANGAN =============
         
-        st.markdown("""
-        <div class="insight-box">
-            <h4>📈 Capaian Realisasi Investasi</h4>
-            <ul>
-                <li>Capaian realisasi investasi mengalami sedikit penurunan dibanding target, terutama dari sektor PMDN</li>
-                <li>Namun, proyek strategis nasional di <strong>Batang</strong> dan <strong>kendal</strong> menunjukkan peningkatan signifikan</li>
-                <li>Perlu fokus pada penyederhanaan proses perizinan, perbaikan sistem OSS, serta penguatan promosi sektor unggulan di kawasan</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+        with metrics.section("insight"):
+            # Temuan otomatis: indikator di luar target dan wilayah yang menyimpang
+            # dari wilayah sebanding (lihat anomaly.py)
+            findings = anomaly.findings(stats_data, selection.kabupaten, INSIGHT_ANOMALIES)
+            st.markdown(f"""
+            <div class="insight-box">
+                <h4>📈 Capaian Realisasi Investasi</h4>
+                <ul>
+                    <li>Capaian realisasi investasi mengalami sedikit penurunan dibanding target, terutama dari sektor PMDN</li>
+                    <li>Namun, proyek strategis nasional di <strong>Batang</strong> dan <strong>kendal</strong> menunjukkan peningkatan signifikan</li>
+                    <li>Perlu fokus pada penyederhanaan proses perizinan, perbaikan sistem OSS, serta penguatan promosi sektor unggulan di kawasan</li>
+                    {"".join(findings)}
+                </ul>
+            </div>
+            """, unsafe_allow_html=True)
 
         # Indikator Performa
         st.markdown('<div class="section-title">📊 Indikator Performa</div>', unsafe_allow_html=True)
@@ -394,143 +536,115 @@ with tab1:
         # KPI Cards
         st.markdown('<div class="section-title">💰 Nilai Investasi Masuk</div>', unsafe_allow_html=True)
         
-        kpi_data = [
-            {"label": "Nilai Investasi Masuk", "value": "85,0 T", "suffix": "85,6 T*"},
-            {"label": "Realisasi PMA", "value": "47,2 T", "suffix": ""},
-            {"label": "Jumlah Proyek", "value": "1,250", "suffix": "1,24 T"},
-            {"label": "Rasio Investasi terhadap", "value": "29,9 %", "suffix": "29,8 %"},
-            {"label": "Tingkat Kepatuhan OSS", "value": "81,2 %", "suffix": ""}
-        ]
-        
-        for kpi in kpi_data:
-            st.markdown(f"""
-            <div class="kpi-card">
-                <div class="kpi-label">{kpi['label']}</div>
-                <div class="kpi-value">{kpi['value']}</div>
-                {f'<div style="font-size: 0.8rem; opacity: 0.8;">{kpi["suffix"]}</div>' if kpi['suffix'] else ''}
-            </div>
-            """, unsafe_allow_html=True)
+        with metrics.section("kpi"):
+            if dataset_ready('kpi_data'):
+                # Tiga KPI pertama dibaca dari kubus agregasi bila data proyek tersedia
+                with metrics.phase(metrics.DATA):
+                    kpi_data = data.kpi_cards(snapshot.kpi_data, periode, selection.kabupaten)
+        
+                for kpi in kpi_data:
+                    st.markdown(f"""
+                    <div class="kpi-card">
+                        <div class="kpi-label">{kpi['label']}</div>
+                        <div class="kpi-value">{kpi['value']}</div>
+                        {f'<div style="font-size: 0.8rem; opacity: 0.8;">{kpi["suffix"]}</div>' if kpi['suffix'] else ''}
+                    </div>
+                    """, unsafe_allow_html=True)
         
 
 # Tab Kesehatan
-with tab2:
+@st.fragment
+@metrics.timed("kesehatan")
+def render_kesehatan():
     st.info("🏥 Dashboard Kesehatan - Dalam Pengembangan")
     
     # Contoh chart untuk kesehatan
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("🏥 Fasilitas Kesehatan")
-        health_facilities = pd.DataFrame({
-            'Jenis Fasilitas': ['RS Pemerintah', 'RS Swasta', 'Puskesmas', 'Klinik'],
-            'Jumlah': [1200, 2800, 9500, 15000]
-        })
-        
-        fig_bar = px.bar(
-            health_facilities,
-            x='Jenis Fasilitas',
-            y='Jumlah',
-            color='Jumlah',
-            color_continuous_scale='Blues'
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        if dataset_ready('health_facilities'):
+            health_facilities = snapshot.health_facilities
+            
+            fig_bar = charts.health_facilities_figure(health_facilities)
+            st.plotly_chart(fig_bar, use_container_width=True)
     
     with col2:
         st.subheader("💉 Cakupan Vaksinasi")
-        vaccination_data = pd.DataFrame({
-            'Provinsi': ['DKI Jakarta', 'Jawa Barat', 'Jawa Tengah', 'Jawa Timur', 'Sumatera Utara'],
-            'Cakupan (%)': [95.2, 87.3, 91.8, 89.4, 84.7]
-        })
-        
-        fig_horizontal = px.bar(
-            vaccination_data,
-            x='Cakupan (%)',
-            y='Provinsi',
-            orientation='h',
-            color='Cakupan (%)',
-            color_continuous_scale='Greens'
-        )
-        st.plotly_chart(fig_horizontal, use_container_width=True)
+        if dataset_ready('vaccination_data'):
+            vaccination_data = snapshot.vaccination_data
+            
+            fig_horizontal = charts.vaccination_figure(vaccination_data)
+            st.plotly_chart(fig_horizontal, use_container_width=True)
 
 # Tab Transportasi
-with tab3:
+@st.fragment
+@metrics.timed("transportasi")
+def render_transportasi():
     st.info("🚌 Dashboard Transportasi - Dalam Pengembangan")
     
     # Contoh untuk transportasi
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("🚊 Transportasi Publik")
-        transport_data = pd.DataFrame({
-            'Moda': ['Bus', 'KRL', 'MRT', 'LRT', 'Angkot'],
-            'Penumpang/Hari': [150000, 800000, 120000, 80000, 200000]
-        })
-        
-        fig_donut = px.pie(
-            transport_data,
-            values='Penumpang/Hari',
-            names='Moda',
-            hole=0.4,
-            color_discrete_sequence=px.colors.qualitative.Pastel
-        )
-        st.plotly_chart(fig_donut, use_container_width=True)
+        if dataset_ready('transport_data'):
+            transport_data = snapshot.transport_data
+            
+            fig_donut = charts.transport_figure(transport_data)
+            st.plotly_chart(fig_donut, use_container_width=True)
     
     with col2:
         st.subheader("🛣️ Kondisi Jalan")
-        road_condition = pd.DataFrame({
-            'Kondisi': ['Baik', 'Sedang', 'Rusak Ringan', 'Rusak Berat'],
-            'Persentase': [45, 30, 20, 5]
-        })
-        
-        fig_funnel = px.funnel(
-            road_condition,
-            x='Persentase',
-            y='Kondisi',
-            color='Kondisi',
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
-        st.plotly_chart(fig_funnel, use_container_width=True)
+        if dataset_ready('road_condition'):
+            road_condition = snapshot.road_condition
+            
+            fig_funnel = charts.road_condition_figure(road_condition)
+            st.plotly_chart(fig_funnel, use_container_width=True)
 
 # Tab Infrastruktur
-with tab4:
+@st.fragment
+@metrics.timed("infrastruktur")
+def render_infrastruktur():
     st.info("🏗️ Dashboard Infrastruktur - Dalam Pengembangan")
     
     # Contoh untuk infrastruktur
     col1, col2 = st.columns(2)
     with col1:
         st.subheader("🏗️ Proyek Infrastruktur")
-        infra_projects = pd.DataFrame({
-            'Sektor': ['Jalan Tol', 'Bandara', 'Pelabuhan', 'Bendungan', 'Pembangkit Listrik'],
-            'Anggaran (Triliun)': [85.5, 45.2, 32.8, 28.6, 67.9],
-            'Progress (%)': [78, 65, 82, 91, 55]
-        })
-        
-        fig_scatter = px.scatter(
-            infra_projects,
-            x='Anggaran (Triliun)',
-            y='Progress (%)',
-            size='Anggaran (Triliun)',
-            color='Sektor',
-            hover_name='Sektor',
-            size_max=20
-        )
-        st.plotly_chart(fig_scatter, use_container_width=True)
+        if dataset_ready('infra_projects'):
+            infra_projects = snapshot.infra_projects
+            
+            fig_scatter = charts.infra_projects_figure(infra_projects)
+            st.plotly_chart(fig_scatter, use_container_width=True)
     
     with col2:
         st.subheader("⚡ Konsumsi Energi")
-        energy_data = pd.DataFrame({
-            'Bulan': pd.date_range('2024-01-01', periods=12, freq='M'),
-            'Konsumsi (TWh)': np.random.uniform(15, 25, 12)
-        })
-        
-        fig_area = px.area(
-            energy_data,
-            x='Bulan',
-            y='Konsumsi (TWh)',
-            color_discrete_sequence=['#ff6b6b']
-        )
-        st.plotly_chart(fig_area, use_container_width=True)
+        if dataset_ready('energy_data'):
+            energy_data = snapshot.energy_data
+            
+            fig_area = charts.energy_figure(energy_data)
+            st.plotly_chart(fig_area, use_container_width=True)
+
+# Tabs untuk kategori
+TAB_SECTIONS = {
+    "📚 Investasi": render_investasi,
+    "🏥 Kesehatan": render_kesehatan,
+    "🚌 Transportasi": render_transportasi,
+    "🏗️ Infrastruktur": render_infrastruktur,
+}
 
+st.markdown('<div class="tab-container">', unsafe_allow_html=True)
+tabs = st.tabs(list(TAB_SECTIONS), key="tab_aktif", on_change="rerun")
+for tab, render_section in zip(tabs, TAB_SECTIONS.values()):
+    with tab:
+        if tab.open:
+            render_section()
 st.markdown('</div>', unsafe_allow_html=True)
 
+# Panel instrumentasi diisi setelah semua bagian dijalankan agar memuat angka rerun ini
+if advanced_view:
+    with st.sidebar:
+        render_metrics_panel()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -538,70 +652,3 @@ st.markdown("""
     📊 Dashboard Investasi Daerah | Data per {date} | Sumber: BKPM & Dinas PMPTSP
 </div>
 """.format(date=datetime.now().strftime("%B %Y")), unsafe_allow_html=True)
-
-# Sidebar untuk kontrol tambahan
-with st.sidebar:
-    st.header("🎛️ Kontrol Dashboard")
-    
-    # Filter periode
-    periode = st.selectbox(
-        "Periode Data",
-        ["Bulanan", "Triwulanan", "Tahunan"],
-        index=2
-    )
-    
-    # Filter wilayah
-    wilayah_focus = st.multiselect(
-        "Fokus Wilayah",
-        ["Semarang", "Kendal", "Batang", "Pekalongan", "Pemalang"],
-        default=["Semarang", "Kendal", "Batang"]
-    )
-    
-    # Toggle advanced view
-    advanced_view = st.checkbox("Mode Lanjutan", value=False)
-    
-    if advanced_view:
-        st.subheader("⚙️ Pengaturan Lanjutan")
-        
-        # Threshold settings
-        investment_threshold = st.slider(
-            "Ambang Batas Investasi (T)",
-            min_value=1.0,
-            max_value=100.0,
-            value=50.0,
-            step=5.0
-        )
-        
-        # Export options
-        st.subheader("📤 Export Data")
-        export_format = st.radio(
-            "Format Export",
-            ["CSV", "Excel", "PDF Report"]
-        )
-        
-        if st.button("📥 Download Data"):
-            if export_format == "CSV":
-                csv_data = jateng_data.to_csv(index=False)
-                st.download_button(
-                    "Download CSV",
-                    csv_data,
-                    f"investasi_data_{datetime.now().strftime('%Y%m%d')}.csv",
-                    "text/csv"
-                )
-    
-    # Status sistem
-    st.markdown("---")
-    st.markdown("**🔄 Status Sistem:**")
-    st.success("✅ Koneksi Database: Normal")
-    st.success("✅ Update Data: Real-time")
-    st.info(f"🕐 Terakhir refresh: {datetime.now().strftime('%H:%M:%S')}")
-    
-    # Quick actions
-    st.markdown("**⚡ Quick Actions:**")
-    col_a, col_b = st.columns(2)
-    with col_a:
-        if st.button("🔄 Refresh"):
-            st.rerun()
-    with col_b:
-        if st.button("📊 Report"):
-            st.info("Generating report...")
\ No newline at end of file
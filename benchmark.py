@@ -0,0 +1,332 @@
+"""Benchmark headless dashboard: memutar ulang interaksi pengguna atas app.py.
+
+Setiap skala data dijalankan di proses anak dengan penyimpanan sementara berisi
+data proyek sintetis (diperbesar dari data contoh bawaan). Untuk setiap langkah
+interaksi dicatat waktu total rerun, waktu per bagian (metrics.section), ukuran
+payload grafik/tabel yang dikirim ke browser, dan memori puncak.
+
+Mulai dingin diukur di proses baru tersendiri: sekali tanpa pemanasan (waktu
+proses sampai render pertama selesai) dan sekali dengan warmup.warm_up() (lama
+pemanasan dan render pertama sesi baru sesudahnya). Render pertama setelah
+pemanasan dibandingkan dengan anggaran --cold-start-budget.
+
+Penggunaan:
+    python benchmark.py --rows 10000 100000 1000000
+    python benchmark.py --rows 100000 --output hasil.jsonl
+    python benchmark.py --rows 100000 --baseline hasil.jsonl --tolerance 0.25
+    python benchmark.py --rows 100000 --cold-start-budget 1500
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+APP_TIMEOUT = 600
+CSV_CHUNK_ROWS = 500_000
+# Anggaran bawaan render pertama sesi baru setelah pemanasan (ms)
+COLD_START_BUDGET_MS = 2000
+
+# Porsi baris Jawa Tengah dalam data sintetis; sisanya dibagi rata ke provinsi lain
+JATENG_SHARE = 0.4
+YEARS = list(range(2016, 2025))
+
+
+def _widget(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def _set_tab(label):
+    def action(at):
+        at.session_state["tab_aktif"] = label
+    return action
+
+
+# Urutan interaksi yang diputar ulang: (nama langkah, aksi pada AppTest).
+# Aksi None berarti rerun tanpa perubahan (muat awal).
+SCENARIO = [
+    ("muat awal", None),
+    ("periode Triwulanan", lambda at: _widget(at.sidebar.selectbox, "Periode Data").select("Triwulanan")),
+    ("periode Bulanan", lambda at: _widget(at.sidebar.selectbox, "Periode Data").select("Bulanan")),
+    ("wilayah +Pekalongan", lambda at: _widget(at.sidebar.multiselect, "Fokus Wilayah").select("Pekalongan")),
+    ("wilayah -Semarang", lambda at: _widget(at.sidebar.multiselect, "Fokus Wilayah").unselect("Semarang")),
+    ("mode lanjutan", lambda at: _widget(at.sidebar.checkbox, "Mode Lanjutan").check()),
+] + [
+    # Menggeser slider menghasilkan satu rerun per nilai yang dilewati
+    (f"ambang {value:g}", lambda at, value=value: _widget(at.sidebar.slider, "Ambang Batas Investasi (T)").set_value(value))
+    for value in (45.0, 40.0, 35.0, 30.0)
+] + [
+    ("cari 'kendal'", lambda at: at.text_input[0].input("kendal")),
+    ("cari 'tol'", lambda at: at.text_input[0].input("tol")),
+    ("hapus pencarian", lambda at: at.text_input[0].input("")),
+    ("zoom 10", lambda at: at.select_slider(key="map_zoom").set_value(10)),
+    ("zoom 12", lambda at: at.select_slider(key="map_zoom").set_value(12)),
+    ("tab Kesehatan", _set_tab("🏥 Kesehatan")),
+    ("tab Transportasi", _set_tab("🚌 Transportasi")),
+    ("tab Infrastruktur", _set_tab("🏗️ Infrastruktur")),
+    ("tab Investasi", _set_tab("📚 Investasi")),
+]
+
+# Ekspor dijalankan di luar rerun (seperti tombol unduh di aplikasi)
+EXPORTS = ["CSV", "Excel", "PDF Report"]
+
+
+def synthetic_csv(path, rows, seed=0):
+    """Tulis data proyek sintetis sebanyak `rows` baris ke `path` (CSV).
+
+    Kabupaten/kota, koordinat, status, dan besaran investasi Jawa Tengah
+    diturunkan dari data contoh peta; provinsi lain dari data contoh vaksinasi,
+    sektor dari data contoh infrastruktur.
+    """
+    import data
+
+    rng = np.random.default_rng(seed)
+    jateng = data.load_jateng_data()
+    provinces = [p for p in data._sample_vaccination_data()['Provinsi'] if p != 'Jawa Tengah']
+    sectors = data._sample_infra_projects()['Sektor'].to_numpy(dtype=object)
+    names = jateng['Kabupaten/Kota'].to_numpy(dtype=object)
+    statuses = jateng['Status'].unique().astype(object)
+
+    with open(path, "wb") as f:
+        written = 0
+        while written < rows:
+            n = min(CSV_CHUNK_ROWS, rows - written)
+            in_jateng = rng.random(n) < JATENG_SHARE
+            kab = rng.integers(0, len(names), n)
+            other = rng.integers(0, len(provinces), n)
+            sector = sectors[rng.integers(0, len(sectors), n)]
+
+            provinsi = np.where(in_jateng, 'Jawa Tengah', np.asarray(provinces, dtype=object)[other])
+            kabupaten = np.where(in_jateng, names[kab],
+                                 [f"{p} {k + 1}" for p, k in zip(provinsi, kab)])
+            lat = np.where(in_jateng, jateng['Lat'].to_numpy()[kab] + rng.normal(0, 0.05, n), np.nan)
+            lon = np.where(in_jateng, jateng['Lon'].to_numpy()[kab] + rng.normal(0, 0.05, n), np.nan)
+
+            table = pa.table({
+                'Provinsi': provinsi,
+                'Tahun': rng.choice(YEARS, n),
+                'Bulan': rng.integers(1, 13, n),
+                'Kabupaten/Kota': kabupaten,
+                'Nama Proyek': [f"Proyek {s} {written + i + 1}" for i, s in enumerate(sector)],
+                'Sektor': sector,
+                'Jenis': np.where(rng.random(n) < 0.5, 'PMA', 'PMDN'),
+                'Status': statuses[rng.integers(0, len(statuses), n)],
+                'Investasi': jateng['Investasi'].to_numpy()[kab] * rng.uniform(0.2, 1.2, n),
+                'Lat': lat,
+                'Lon': lon,
+            })
+            pacsv.write_csv(table, f, pacsv.WriteOptions(include_header=written == 0))
+            written += n
+
+
+def _payload_bytes(at, element_type):
+    return sum(e.proto.ByteSize() for e in at.get(element_type))
+
+
+def _measure(step, func, trace_memory):
+    import metrics
+
+    metrics.recorder.reset()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    wall = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        'step': step,
+        'wall_ms': wall * 1000,
+        'sections_ms': {name: s['total'] * 1000 for name, s in metrics.recorder.sections().items()},
+        'peak_traced_mb': None if peak is None else peak / 2 ** 20,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_scale(rows, trace_memory=False):
+    """Jalankan skenario untuk satu skala data; dipanggil di proses anak."""
+    workdir = tempfile.mkdtemp(prefix="benchmark-")
+    os.environ["DASHBOARD_STORE_DIR"] = os.path.join(workdir, "proyek")
+    os.environ["DASHBOARD_DB"] = os.path.join(workdir, "dashboard.sqlite3")
+    os.environ["DASHBOARD_REPORT_DIR"] = os.path.join(workdir, "laporan")
+    os.environ["DASHBOARD_DROP_DIR"] = os.path.join(workdir, "masuk")
+    os.environ["DASHBOARD_METRICS"] = "1"
+
+    from streamlit.testing.v1 import AppTest
+
+    import data
+    import export
+    import query
+
+    if rows:
+        csv_path = os.path.join(workdir, "sintetis.csv")
+        synthetic_csv(csv_path, rows)
+        data.ingest_csv(csv_path)
+        data.clear_cache()
+
+    results = []
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+    for step, action in SCENARIO:
+        if action is not None:
+            action(at)
+        result = _measure(step, at.run, trace_memory)
+        if at.exception:
+            raise RuntimeError(f"{step}: {at.exception[0].message}")
+        result['figure_bytes'] = _payload_bytes(at, "plotly_chart")
+        result['table_bytes'] = _payload_bytes(at, "dataframe")
+        result['file_bytes'] = 0
+        results.append(result)
+
+    flt = query.DashboardFilter(
+        _widget(at.sidebar.multiselect, "Fokus Wilayah").value,
+        _widget(at.sidebar.slider, "Ambang Batas Investasi (T)").value
+    )
+    for export_format in EXPORTS:
+        files = []
+        result = _measure(f"ekspor {export_format}", lambda: files.append(export.export_file(export_format, flt)), trace_memory)
+        result['figure_bytes'] = result['table_bytes'] = 0
+        result['file_bytes'] = files[0].seek(0, os.SEEK_END)
+        results.append(result)
+
+    results.extend(cold_start())
+    for result in results:
+        result['rows'] = rows
+    return results
+
+
+def _cold_start_child(warm):
+    """Dijalankan di proses baru: waktu sampai render pertama, opsional setelah pemanasan."""
+    warmup_s = None
+    if warm:
+        import warmup
+        warmup_s = sum(warmup.warm_up().values())
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=APP_TIMEOUT)
+    start = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return {'warmup_s': warmup_s, 'render_s': time.perf_counter() - start}
+
+
+def cold_start():
+    """Ukur mulai dingin di proses baru, tanpa dan dengan pemanasan."""
+    results = []
+    for warm in (False, True):
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--cold-start"]
+        if warm:
+            command.append("--warm")
+        start = time.perf_counter()
+        proc = subprocess.run(command, capture_output=True, text=True, check=True)
+        process_s = time.perf_counter() - start
+        child = json.loads(proc.stdout.splitlines()[-1])
+        if warm:
+            steps = [("pemanasan", child['warmup_s']), ("render pertama (panas)", child['render_s'])]
+        else:
+            # Termasuk memulai interpreter dan semua impor, seperti replika baru tanpa pemanasan
+            steps = [("mulai dingin", process_s)]
+        for step, seconds in steps:
+            results.append({
+                'step': step, 'wall_ms': seconds * 1000, 'sections_ms': {},
+                'peak_traced_mb': None, 'max_rss_mb': 0,
+                'figure_bytes': 0, 'table_bytes': 0, 'file_bytes': 0,
+            })
+    return results
+
+
+def print_results(results):
+    rows = results[0]['rows']
+    print(f"\n== {rows:,} baris ==")
+    print(f"{'langkah':<22}{'total ms':>10}{'grafik KB':>11}{'tabel KB':>10}{'file KB':>10}"
+          f"{'puncak MB':>11}{'RSS MB':>9}  bagian (ms)")
+    for r in results:
+        peak = "-" if r['peak_traced_mb'] is None else f"{r['peak_traced_mb']:.1f}"
+        sections = " ".join(f"{name}={ms:.0f}" for name, ms in sorted(r['sections_ms'].items(), key=lambda kv: -kv[1]))
+        print(f"{r['step']:<22}{r['wall_ms']:>10.1f}{r['figure_bytes'] / 1024:>11.1f}{r['table_bytes'] / 1024:>10.1f}"
+              f"{r['file_bytes'] / 1024:>10.1f}{peak:>11}{r['max_rss_mb']:>9.0f}  {sections}")
+
+
+def compare(results, baseline_path, tolerance):
+    """Langkah yang lebih lambat dari baseline melebihi `tolerance` (proporsi)."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r['rows'], r['step']): r for r in map(json.loads, f)}
+    regressions = []
+    for r in results:
+        base = baseline.get((r['rows'], r['step']))
+        if base and r['wall_ms'] > base['wall_ms'] * (1 + tolerance):
+            regressions.append((r['rows'], r['step'], base['wall_ms'], r['wall_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[0, 100_000],
+                        help="banyak baris data proyek sintetis per skala (0 = data contoh bawaan)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="ukur memori puncak per langkah dengan tracemalloc (memperlambat)")
+    parser.add_argument("--output", help="simpan hasil sebagai JSON lines")
+    parser.add_argument("--baseline", help="hasil JSON lines sebelumnya untuk deteksi regresi")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--cold-start-budget", type=float, default=COLD_START_BUDGET_MS,
+                        help="batas waktu render pertama setelah pemanasan (ms)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--cold-start", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child and args.cold_start:
+        print(json.dumps(_cold_start_child(args.warm)))
+        return 0
+    if args.child:
+        # Hasil di baris terakhir stdout; keluaran lain dari aplikasi diabaikan induk
+        print(json.dumps(run_scale(args.rows[0], args.trace_memory)))
+        return 0
+
+    # Satu proses per skala: cache tingkat proses (kubus, indeks, snapshot) tidak terbawa
+    results = []
+    for rows in args.rows:
+        command = [sys.executable, os.path.abspath(__file__), "--child", "--rows", str(rows)]
+        if args.trace_memory:
+            command.append("--trace-memory")
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.stderr.write(proc.stderr)
+            return proc.returncode
+        scale_results = json.loads(proc.stdout.splitlines()[-1])
+        print_results(scale_results)
+        results.extend(scale_results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r) + "\n")
+
+    status = 0
+    for r in results:
+        if r['step'] == "render pertama (panas)" and r['wall_ms'] > args.cold_start_budget:
+            print(f"ANGGARAN {r['rows']:,} baris, {r['step']}: {r['wall_ms']:.1f} ms > {args.cold_start_budget:.0f} ms")
+            status = 1
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for rows, step, before, after in regressions:
+            print(f"REGRESI {rows:,} baris, {step}: {before:.1f} ms -> {after:.1f} ms")
+        if regressions:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import metrics
+import sharedcache
+
+# Banyak figure maksimum yang disimpan di cache (LRU, bersama untuk semua sesi)
+FIGURE_CACHE_SIZE = 64
+
+
+def _fingerprint(value):
+    """Sidik jari isi argumen builder; DataFrame di-hash berdasarkan isinya."""
+    if isinstance(value, pd.DataFrame):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((list(value.columns), list(value.dtypes.astype(str)))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        return digest.hexdigest()
+    if isinstance(value, pd.Series):
+        return _fingerprint(value.to_frame())
+    return repr(value)
+
+
+def _figure_bytes(fig):
+    return fig.to_json().encode()
+
+
+def _load_figure(blob):
+    return pio.from_json(blob.decode())
+
+
+class FigureCache:
+    """Cache LRU figure Plotly dengan penghitung hit/miss per grafik.
+
+    Figure yang tidak ada di cache proses dicari dulu di cache bersama
+    (sharedcache) sebagai JSON sebelum dibangun ulang.
+    """
+
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._figures = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def get_or_build(self, name, builder, args, kwargs):
+        key = (name, tuple(_fingerprint(a) for a in args),
+               tuple(sorted((k, _fingerprint(v)) for k, v in kwargs.items())))
+        with self._lock:
+            stats = self.stats.setdefault(name, {'hits': 0, 'misses': 0})
+            if key in self._figures:
+                self._figures.move_to_end(key)
+                stats['hits'] += 1
+                return self._figures[key]
+            stats['misses'] += 1
+
+        # Sidik jari bergantung pada isi argumen, bukan identitas objek, sehingga
+        # sama di semua worker; versi plotly ikut menentukan format JSON-nya
+        fig = sharedcache.get_or_compute(
+            'grafik', f"{name}:{sharedcache.digest(key)}", plotly.__version__,
+            lambda: builder(*args, **kwargs), dumps=_figure_bytes, loads=_load_figure
+        )
+        with self._lock:
+            self._figures[key] = fig
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.maxsize:
+                evicted, _ = self._figures.popitem(last=False)
+                self._sizes.pop(evicted, None)
+        return fig
+
+    def payload_bytes(self, fig):
+        """Ukuran JSON figure di cache (byte), dihitung sekali per figure; None bila tidak di cache."""
+        with self._lock:
+            key = next((k for k, cached in self._figures.items() if cached is fig), None)
+            size = self._sizes.get(key)
+        if key is None or size is not None:
+            return size
+        size = len(fig.to_json())
+        with self._lock:
+            if key in self._figures:
+                self._sizes[key] = size
+        return size
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self._sizes.clear()
+
+
+figure_cache = FigureCache()
+metrics.register_cache("grafik", lambda: {name: dict(counts) for name, counts in figure_cache.stats.items()})
+
+
+def cached_figure(name):
+    """Dekorator: figure hanya dibangun ulang bila data atau parameternya berubah.
+
+    Figure hasil cache dipakai bersama oleh semua sesi, jadi pemanggil tidak boleh
+    mengubahnya (mis. update_layout) setelah diterima.
+    """
+    def decorator(builder):
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            with metrics.phase(metrics.FIGURE):
+                fig = figure_cache.get_or_build(name, builder, args, kwargs)
+            if metrics.active():
+                size = figure_cache.payload_bytes(fig)
+                if size is not None:
+                    metrics.recorder.record_figure(name, size)
+            return fig
+        return wrapper
+    return decorator
+
+
+# ============= INVESTASI =============
+
+# Gaya peta dasar. "open-street-map" memuat tile dari server OSM; untuk
+# penggunaan tanpa internet pakai "white-bg" (hanya lapisan batas wilayah lokal)
+MAP_STYLE = os.environ.get("DASHBOARD_MAP_STYLE", "open-street-map")
+
+MAP_COLORS = {
+    'Realisasi': '#38a169',      # Hijau
+    'Nasional Imajiner': '#e53e3e',  # Merah
+    'Imajiner': '#3182ce'        # Biru
+}
+# Penanda wilayah yang ditandai anomaly.region_anomalies()
+ANOMALY_COLOR = '#ed8936'
+
+
+@cached_figure("map")
+def map_figure(markers, zoom, center, boundaries=None, region_totals=None, anomalies=None):
+    """Peta penanda investasi; `boundaries` (tiles.BoundaryLevel) menambah lapisan
+    choropleth batas wilayah yang diwarnai menurut `region_totals`. Wilayah di
+    `anomalies` (anomaly.region_anomalies) ditandai lingkaran dan garis batas oranye."""
+    fig_map = px.scatter_mapbox(
+        markers,
+        lat="Lat",
+        lon="Lon",
+        color="Status",
+        size="Investasi",
+        hover_name="Kabupaten/Kota",
+        hover_data={"Investasi": ":.1f", "Status": True, "Jumlah": True},
+        color_discrete_map=MAP_COLORS,
+        size_max=20,
+        zoom=zoom,
+        center=center,
+        height=400,
+        mapbox_style=MAP_STYLE
+    )
+
+    flagged = set() if anomalies is None else set(anomalies['Kabupaten/Kota'])
+    if boundaries is not None:
+        totals = region_totals if region_totals is not None else pd.Series(dtype=float)
+        fig_map.add_trace(go.Choroplethmapbox(
+            geojson=boundaries.geojson,
+            locations=boundaries.ids,
+            z=totals.reindex(boundaries.ids).fillna(0).to_numpy(),
+            colorscale="Blues",
+            marker_opacity=0.35,
+            marker_line_width=[2 if name in flagged else 0.5 for name in boundaries.ids],
+            marker_line_color=[ANOMALY_COLOR if name in flagged else "#4a5568" for name in boundaries.ids],
+            showscale=False,
+            hovertemplate="%{location}<br>Investasi: %{z:.1f} T<extra></extra>",
+        ))
+        # Lapisan batas digambar di bawah penanda
+        fig_map.data = fig_map.data[-1:] + fig_map.data[:-1]
+
+    if anomalies is not None:
+        located = anomalies.dropna(subset=['Lat', 'Lon'])
+        if not located.empty:
+            fig_map.add_trace(go.Scattermapbox(
+                lat=located['Lat'],
+                lon=located['Lon'],
+                mode="markers",
+                marker=dict(size=28, color=ANOMALY_COLOR, opacity=0.35),
+                name="Anomali",
+                text=located['Kabupaten/Kota'] + "<br>" + located['Alasan'],
+                hovertemplate="%{text}<extra></extra>",
+            ))
+
+    fig_map.update_layout(
+        margin={"r":0,"t":0,"l":0,"b":0},
+        legend=dict(
+            title="Legenda",
+            orientation="v",
+            yanchor="top",
+            y=1,
+            xanchor="left",
+            x=0.01,
+            bgcolor="rgba(255,255,255,0.8)"
+        )
+    )
+    return fig_map
+
+
+@cached_figure("trend")
+def trend_figure(trend_data, forecast=None):
+    """Tren per provinsi; `forecast` (lihat forecast.trend_forecast) menambah
+    garis proyeksi putus-putus beserta pita kepercayaannya."""
+    fig_trend = go.Figure()
+    colors = ['#38a169', '#3182ce', '#e53e3e', '#ed8936']
+
+    for i, col in enumerate(trend_data.columns.drop('Periode')):
+        color = colors[i % len(colors)]
+        fig_trend.add_trace(go.Scatter(
+            x=trend_data['Periode'],
+            y=trend_data[col],
+            mode='lines+markers',
+            name=col,
+            legendgroup=col,
+            line=dict(color=color, width=3),
+            marker=dict(size=6)
+        ))
+        if forecast is None:
+            continue
+        projected = forecast[forecast['Provinsi'] == col]
+        if projected.empty:
+            continue
+        # Proyeksi disambung dari titik terakhir data aktual
+        x = [trend_data['Periode'].iloc[-1]] + list(projected['Periode'])
+        last = trend_data[col].iloc[-1]
+        fill = 'rgba({}, {}, {}, 0.15)'.format(*(int(color[j:j + 2], 16) for j in (1, 3, 5)))
+        fig_trend.add_trace(go.Scatter(
+            x=x + x[::-1],
+            y=[last] + list(projected['Atas']) + list(projected['Bawah'])[::-1] + [last],
+            fill='toself',
+            fillcolor=fill,
+            line=dict(width=0),
+            hoverinfo='skip',
+            showlegend=False,
+            legendgroup=col
+        ))
+        fig_trend.add_trace(go.Scatter(
+            x=x,
+            y=[last] + list(projected['Prediksi']),
+            mode='lines',
+            name=f"{col} (proyeksi)",
+            legendgroup=col,
+            showlegend=False,
+            line=dict(color=color, width=2, dash='dash')
+        ))
+
+    fig_trend.update_layout(
+        height=300,
+        xaxis_title="Periode",
+        yaxis_title="Nilai (Triliun)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(t=40)
+    )
+    return fig_trend
+
+
+# Warna kotak tahap di diagram alur; tahap yang tidak disebut memakai FLOW_COLOR
+FLOW_COLORS = {"Realisasi Proyek": "#e53e3e"}
+FLOW_COLOR = "#38a169"
+
+
+@cached_figure("flow")
+def flow_figure(stages):
+    """Diagram alur tahap proyek dari lifecycle.ProjectLifecycle.stage_table().
+
+    Kotak berisi banyak proyek per tahap; tahap disusun ke kanan mengikuti kolom
+    Dari, dan panah masuk diberi label banyak perpindahan ke tahap itu.
+    """
+    fig_flow = go.Figure()
+
+    # Kolom kotak = kedalaman tahap di alur; kotak satu kolom disusun vertikal
+    parents = dict(zip(stages['Tahap'], stages['Dari']))
+
+    def depth(stage):
+        return 0 if parents[stage] is None else depth(parents[stage]) + 1
+    columns = {}
+    for stage in stages['Tahap']:
+        columns.setdefault(depth(stage), []).append(stage)
+    positions = {
+        stage: (1 + 2 * col, 3 + (len(members) - 1) / 2 - i)
+        for col, members in columns.items()
+        for i, stage in enumerate(members)
+    }
+
+    shapes = []
+    annotations = []
+    for row in stages.itertuples(index=False):
+        x, y = positions[row.Tahap]
+        color = FLOW_COLORS.get(row.Tahap, FLOW_COLOR)
+        shapes.append(
+            dict(
+                type="rect",
+                x0=x-0.4, y0=y-0.35,
+                x1=x+0.4, y1=y+0.35,
+                fillcolor=color,
+                line=dict(color=color, width=2),
+                opacity=0.8
+            )
+        )
+        annotations.append(
+            dict(
+                x=x, y=y,
+                text=f"{row.Tahap.replace(' ', '<br>')}<br><b>{row.Proyek:,}</b>",
+                showarrow=False,
+                font=dict(color="white", size=10),
+                align="center"
+            )
+        )
+        if row.Dari is None:
+            continue
+        # Panah dari tahap asal ke tahap ini
+        px0, py0 = positions[row.Dari]
+        annotations.append(
+            dict(
+                x=x-0.4, y=y, ax=px0+0.4, ay=py0,
+                xref="x", yref="y", axref="x", ayref="y",
+                text="", showarrow=True, arrowhead=2, arrowwidth=2, arrowcolor="gray"
+            )
+        )
+        if row.Masuk:
+            annotations.append(
+                dict(
+                    x=(x + px0) / 2, y=(y + py0) / 2,
+                    text=f"+{row.Masuk:,}",
+                    showarrow=False,
+                    font=dict(color="gray", size=9),
+                    yshift=8
+                )
+            )
+
+    fig_flow.update_layout(
+        shapes=shapes,
+        annotations=annotations,
+        xaxis=dict(range=[0, 2 * len(columns)], showgrid=False, zeroline=False, showticklabels=False),
+        yaxis=dict(range=[1.5, 4.5], showgrid=False, zeroline=False, showticklabels=False),
+        height=200,
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
+    return fig_flow
+
+
+# ============= KESEHATAN =============
+
+@cached_figure("health_facilities")
+def health_facilities_figure(health_facilities):
+    return px.bar(
+        health_facilities,
+        x='Jenis Fasilitas',
+        y='Jumlah',
+        color='Jumlah',
+        color_continuous_scale='Blues'
+    )
+
+
+@cached_figure("vaccination")
+def vaccination_figure(vaccination_data):
+    return px.bar(
+        vaccination_data,
+        x='Cakupan (%)',
+        y='Provinsi',
+        orientation='h',
+        color='Cakupan (%)',
+        color_continuous_scale='Greens'
+    )
+
+
+# ============= TRANSPORTASI =============
+
+@cached_figure("transport")
+def transport_figure(transport_data):
+    return px.pie(
+        transport_data,
+        values='Penumpang/Hari',
+        names='Moda',
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+
+
+@cached_figure("road_condition")
+def road_condition_figure(road_condition):
+    return px.funnel(
+        road_condition,
+        x='Persentase',
+        y='Kondisi',
+        color='Kondisi',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+
+
+# ============= INFRASTRUKTUR =============
+
+@cached_figure("infra_projects")
+def infra_projects_figure(infra_projects):
+    return px.scatter(
+        infra_projects,
+        x='Anggaran (Triliun)',
+        y='Progress (%)',
+        size='Anggaran (Triliun)',
+        color='Sektor',
+        hover_name='Sektor',
+        size_max=20
+    )
+
+
+@cached_figure("energy")
+def energy_figure(energy_data):
+    return px.area(
+        energy_data,
+        x='Bulan',
+        y='Konsumsi (TWh)',
+        color_discrete_sequence=['#ff6b6b']
+    )
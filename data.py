@@ -0,0 +1,1124 @@
+import contextlib
+import functools
+import hashlib
+import itertools
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import streamlit as st
+
+import loader
+import sharedcache
+
+# Pengaturan cache data: hasil loader dipakai bersama lintas rerun dan sesi,
+# kedaluwarsa setelah CACHE_TTL detik dan dibatasi CACHE_MAX_ENTRIES entri
+CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 16
+
+# Daftar loader yang di-cache, dipakai oleh clear_cache()
+_LOADERS = []
+
+
+def _compacted(value):
+    return compact(value) if isinstance(value, pd.DataFrame) else value
+
+
+def _shared(func):
+    # Hasil loader juga disimpan di cache bersama (sharedcache) dengan kunci versi
+    # data, sehingga worker lain cukup membacanya tanpa memuat ulang. Kolom
+    # kategori dikodekan sebelum disimpan dan dikodekan ulang ke tabel kode
+    # proses ini setelah dibaca (murah: hanya memetakan tabel nilainya).
+    @functools.wraps(func)
+    def load(*args, **kwargs):
+        name = f"{func.__name__}:{sharedcache.digest((args, sorted(kwargs.items())))}"
+        return _compacted(sharedcache.get_or_compute(
+            'dataset', name, data_version(), lambda: _compacted(func(*args, **kwargs)), ttl=CACHE_TTL
+        ))
+    return load
+
+
+def _cached(func):
+    loader = st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)(_shared(func))
+    _LOADERS.append(loader)
+    return loader
+
+
+# ============= PENYIMPANAN KOLOMNAR (PARQUET) =============
+
+# Lokasi penyimpanan data proyek hasil ekspor BKPM/PMPTSP. Dapat diganti lewat
+# variabel lingkungan DASHBOARD_STORE_DIR.
+STORE_DIR = os.environ.get(
+    "DASHBOARD_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "proyek")
+)
+_MANIFEST = "_ingested.txt"
+
+# Skema data proyek; Provinsi dan Tahun menjadi kolom partisi (hive)
+PROJECT_SCHEMA = pa.schema([
+    ('Provinsi', pa.string()),
+    ('Tahun', pa.int32()),
+    ('Bulan', pa.int8()),
+    ('Kabupaten/Kota', pa.string()),
+    ('Nama Proyek', pa.string()),
+    ('Sektor', pa.string()),
+    ('Jenis', pa.string()),          # PMA / PMDN
+    ('Status', pa.string()),
+    ('Investasi', pa.float64()),
+    ('Lat', pa.float64()),
+    ('Lon', pa.float64()),
+])
+PARTITIONING = ds.partitioning(
+    pa.schema([('Provinsi', pa.string()), ('Tahun', pa.int32())]),
+    flavor="hive"
+)
+
+
+def ingested_files(store_dir=STORE_DIR):
+    """Nama file CSV yang sudah pernah dimasukkan ke penyimpanan."""
+    path = os.path.join(store_dir, _MANIFEST)
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def ingest_csv(csv_path, store_dir=STORE_DIR):
+    """Masukkan satu file ekspor CSV ke penyimpanan Parquet terpartisi.
+
+    File dibaca bertahap (streaming) sehingga ukuran ekspor tidak dibatasi memori.
+    File yang sudah pernah dimasukkan dilewati. Mengembalikan True jika ada data baru.
+    """
+    name = os.path.basename(csv_path)
+    if name in ingested_files(store_dir):
+        return False
+
+    os.makedirs(store_dir, exist_ok=True)
+    reader = pacsv.open_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=PROJECT_SCHEMA,
+            include_columns=PROJECT_SCHEMA.names,
+            include_missing_columns=True
+        )
+    )
+    ds.write_dataset(
+        reader,
+        store_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=os.path.splitext(name)[0] + "-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore"
+    )
+    with open(os.path.join(store_dir, _MANIFEST), "a", encoding="utf-8") as f:
+        f.write(name + "\n")
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def project_dataset(store_dir=STORE_DIR):
+    """Handle dataset Parquet yang dibaca secara memory-mapped.
+
+    Handle ini dipakai bersama oleh semua sesi; tidak ada data yang dimuat sampai
+    read_projects() dipanggil. Mengembalikan None jika penyimpanan masih kosong.
+    """
+    if not os.path.isdir(store_dir):
+        return None
+    dataset = ds.dataset(
+        store_dir,
+        schema=PROJECT_SCHEMA,
+        format="parquet",
+        partitioning=PARTITIONING,
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+        exclude_invalid_files=True
+    )
+    return dataset if dataset.files else None
+
+
+def data_version():
+    """Penanda versi data: berubah setiap kali ada file Parquet baru atau berubah.
+
+    Dipakai sebagai bagian kunci cache turunan (laporan, model, snapshot).
+    """
+    dataset = project_dataset()
+    if dataset is None:
+        return "contoh"
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(dataset.files):
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def project_filter(provinsi=None, tahun=None):
+    """Bangun ekspresi filter yang didorong ke pemindaian partisi Parquet."""
+    expr = None
+    for column, value in (('Provinsi', provinsi), ('Tahun', tahun)):
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            cond = ds.field(column).isin(list(value))
+        else:
+            cond = ds.field(column) == value
+        expr = cond if expr is None else expr & cond
+    return expr
+
+
+def files_dataset(files):
+    """Dataset Parquet yang hanya mencakup `files` (mis. file yang belum disinkronkan)."""
+    return ds.dataset(
+        files,
+        schema=PROJECT_SCHEMA,
+        format="parquet",
+        partitioning=PARTITIONING,
+        partition_base_dir=STORE_DIR,
+        filesystem=pafs.LocalFileSystem(use_mmap=True)
+    )
+
+
+def read_projects(columns=None, provinsi=None, tahun=None):
+    """Baca data proyek hanya untuk kolom dan partisi yang diminta.
+
+    Mengembalikan pyarrow.Table, atau None jika penyimpanan belum berisi data.
+    """
+    dataset = project_dataset()
+    if dataset is None:
+        return None
+    return dataset.to_table(columns=columns, filter=project_filter(provinsi, tahun))
+
+
+def iter_jateng_batches(flt=None, columns=None, batch_rows=100_000):
+    """Baca data proyek Jawa Tengah bertahap sebagai potongan DataFrame.
+
+    `flt` adalah query.DashboardFilter; predikatnya didorong ke pemindaian
+    Parquet, sehingga hanya baris yang lolos filter yang pernah dimuat.
+    """
+    dataset = project_dataset()
+    if dataset is None:
+        df = load_jateng_data()
+        if flt is not None:
+            df = df[flt.mask(df)]
+        if columns:
+            df = df[columns]
+        for start in range(0, len(df), batch_rows):
+            yield df.iloc[start:start + batch_rows]
+        return
+
+    expr = project_filter(provinsi='Jawa Tengah')
+    if flt is not None and flt.expression() is not None:
+        expr &= flt.expression()
+    for batch in dataset.to_batches(columns=columns, filter=expr, batch_size=batch_rows):
+        if batch.num_rows:
+            yield to_frame(pa.Table.from_batches([batch]))
+
+
+# ============= KOLOM KATEGORI =============
+
+# Kolom teks berulang yang disimpan sebagai kategori (kode int + tabel nilai)
+CATEGORICAL_COLUMNS = ['Provinsi', 'Kabupaten/Kota', 'Sektor', 'Jenis', 'Status', 'Moda']
+# Kolom angka yang di sumbernya berupa teks bersatuan, mis. '85.5 T'
+UNIT_COLUMNS = {'Realisasi (T)': 'T'}
+
+
+class CodeTable:
+    """Tabel kode kategori bersama untuk semua dataset.
+
+    Kode suatu nilai diberikan saat nilai itu pertama kali muncul dan tidak
+    pernah berubah, sehingga 'Semarang' memiliki kode yang sama di setiap
+    dataset dan snapshot. Tabel kategori hanya bertambah; dtype yang diberikan
+    lebih awal tetap berlaku sebagai awalan dari dtype yang lebih baru.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def dtype(self, column, values=()):
+        """CategoricalDtype kolom `column` setelah `values` baru didaftarkan."""
+        with self._lock:
+            known = self._values.setdefault(column, {})
+            for value in sorted(set(values) - known.keys(), key=str):
+                known[value] = len(known)
+            return pd.CategoricalDtype(list(known))
+
+    def encode(self, series):
+        """Series sebagai kategori dengan kode dari tabel ini."""
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        categories = series.cat.categories
+        dtype = self.dtype(series.name, categories)
+        if categories.equals(dtype.categories):
+            return series
+        return series.cat.set_categories(dtype.categories)
+
+    def sizes(self):
+        """Banyak nilai terdaftar per kolom."""
+        with self._lock:
+            return {column: len(values) for column, values in self._values.items()}
+
+
+codes = CodeTable()
+
+
+def _parse_units(series, unit):
+    # '85.5 T' -> 85.5; nilai yang tidak dapat dibaca menjadi NaN
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    text = series.astype(str).str.strip().str.removesuffix(unit).str.replace(',', '.', regex=False)
+    return pd.to_numeric(text.str.strip(), errors='coerce').astype(float)
+
+
+def compact(df):
+    """DataFrame dengan kolom CATEGORICAL_COLUMNS sebagai kategori dan UNIT_COLUMNS sebagai float."""
+    columns = {}
+    for name in df.columns:
+        if name in CATEGORICAL_COLUMNS:
+            columns[name] = codes.encode(df[name])
+        elif name in UNIT_COLUMNS:
+            columns[name] = _parse_units(df[name], UNIT_COLUMNS[name])
+    return df.assign(**columns) if columns else df
+
+
+def to_frame(table):
+    """pyarrow.Table ke DataFrame ringkas tanpa membuat objek string per baris.
+
+    Kolom kategori di-dictionary-encode di Arrow sehingga pandas langsung
+    menerima kode dan tabel nilainya.
+    """
+    for i, name in enumerate(table.column_names):
+        if name in CATEGORICAL_COLUMNS and pa.types.is_string(table.schema.field(i).type):
+            table = table.set_column(i, name, table.column(i).dictionary_encode())
+    return compact(table.to_pandas())
+
+
+# ============= DATABASE (POOL KONEKSI) =============
+
+# Basis data SQLite lokal untuk tabel-tabel dashboard selain data proyek.
+# Saat pertama dipakai, tabel yang belum ada diisi dari data contoh bawaan.
+DB_PATH = os.environ.get(
+    "DASHBOARD_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "dashboard.sqlite3")
+)
+DB_POOL_SIZE = 4
+DB_TIMEOUT = 5.0
+# Banyak baris yang diambil sekaligus per fetchmany()
+DB_FETCH_ROWS = 50_000
+
+# Kueri berparameter per dataset: (SQL, kolom tanggal yang perlu di-parse)
+DB_QUERIES = {
+    'project_table': ('SELECT "Kabupaten/Kota", "Nilai Indikator", "Ranking", "Realisasi (T)" '
+                      'FROM project_table ORDER BY "Ranking"', []),
+    'health_facilities': ('SELECT "Jenis Fasilitas", "Jumlah" FROM health_facilities', []),
+    'vaccination_data': ('SELECT "Provinsi", "Cakupan (%)" FROM vaccination_data', []),
+    'transport_data': ('SELECT "Moda", "Penumpang/Hari" FROM transport_data', []),
+    'road_condition': ('SELECT "Kondisi", "Persentase" FROM road_condition', []),
+    'infra_projects': ('SELECT "Sektor", "Anggaran (Triliun)", "Progress (%)" FROM infra_projects', []),
+    'energy_data': ('SELECT "Bulan", "Konsumsi (TWh)" FROM energy_data WHERE "Bulan" >= ? ORDER BY "Bulan"', ['Bulan']),
+}
+DB_DEFAULT_PARAMS = {
+    'energy_data': ('2024-01-01',),
+}
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite bersama untuk seluruh proses.
+
+    Koneksi dibuat bertahap sampai `size` lalu dipakai ulang; sesi yang meminta
+    koneksi saat pool penuh menunggu hingga `timeout`. Setiap koneksi menyimpan
+    prepared statement untuk kueri DB_QUERIES (cached_statements).
+    """
+
+    def __init__(self, path=DB_PATH, size=DB_POOL_SIZE, timeout=DB_TIMEOUT):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self.last_latency = None
+        self.last_error = None
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        con = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=len(DB_QUERIES) * 2
+        )
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    @contextlib.contextmanager
+    def connection(self):
+        """Pinjam satu koneksi dari pool selama blok `with`."""
+        con = None
+        with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+                self._waiting += 1
+        try:
+            if create:
+                try:
+                    con = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    con = self._idle.get(timeout=self.timeout)
+                finally:
+                    with self._lock:
+                        self._waiting -= 1
+            with self._lock:
+                self._in_use += 1
+            yield con
+        finally:
+            if con is not None:
+                with self._lock:
+                    self._in_use -= 1
+                self._idle.put(con)
+
+    def fetch(self, sql, params=()):
+        """Jalankan kueri dan kembalikan hasilnya sebagai pyarrow.Table.
+
+        Baris diambil dalam blok besar (fetchmany) dan langsung disusun per kolom.
+        """
+        with self.connection() as con:
+            cursor = con.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            columns = [[] for _ in names]
+            while True:
+                rows = cursor.fetchmany(DB_FETCH_ROWS)
+                if not rows:
+                    break
+                for column, values in zip(columns, zip(*rows)):
+                    column.extend(values)
+        return pa.table(dict(zip(names, (pa.array(c) for c in columns))))
+
+    def health(self):
+        """Status pool: ping SELECT 1, latensi, dan tingkat pemakaian koneksi."""
+        start = time.perf_counter()
+        try:
+            with self.connection() as con:
+                con.execute("SELECT 1").fetchone()
+            self.last_latency = time.perf_counter() - start
+            self.last_error = None
+        except Exception as error:
+            self.last_error = error
+        with self._lock:
+            return {
+                'ok': self.last_error is None,
+                'error': self.last_error,
+                'latency_ms': None if self.last_latency is None else self.last_latency * 1000,
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'size': self.size,
+                'saturation': self._in_use / self.size,
+            }
+
+
+def _seed_database(pool):
+    """Buat tabel yang belum ada dari data contoh bawaan."""
+    with pool.connection() as con:
+        existing = {row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        for name in DB_QUERIES:
+            if name not in existing:
+                globals()[f"_sample_{name}"]().to_sql(name, con, index=False)
+        con.commit()
+
+
+@st.cache_resource(show_spinner=False)
+def database_pool():
+    """Pool koneksi bersama untuk semua sesi."""
+    pool = ConnectionPool()
+    _seed_database(pool)
+    return pool
+
+
+def fetch_table(name, params=None):
+    """Ambil satu dataset dari database lewat kueri berparameternya."""
+    sql, parse_dates = DB_QUERIES[name]
+    if params is None:
+        params = DB_DEFAULT_PARAMS.get(name, ())
+    df = database_pool().fetch(sql, params).to_pandas()
+    for column in parse_dates:
+        df[column] = pd.to_datetime(df[column])
+    return df
+
+
+# ============= DATA INVESTASI =============
+
+@_cached
+def load_jateng_data():
+    """Data sebaran investasi per kabupaten/kota di Jawa Tengah."""
+    table = read_projects(
+        columns=['Kabupaten/Kota', 'Status', 'Investasi', 'Lat', 'Lon'],
+        provinsi='Jawa Tengah'
+    )
+    if table is not None:
+        return to_frame(table)
+
+    return pd.DataFrame({
+        'Kabupaten/Kota': ['Semarang', 'Kendal', 'Batang', 'Pekalongan', 'Pemalang', 'Tegal', 'Brebes'],
+        'Status': ['Realisasi', 'Realisasi', 'Realisasi', 'Nasional Imajiner', 'Imajiner', 'Nasional Imajiner', 'Imajiner'],
+        'Investasi': [97.5, 96.3, 94.3, 87.2, 82.1, 78.5, 75.3],
+        'Lat': [-6.9667, -6.9167, -6.9042, -6.8889, -6.8917, -6.8694, -6.8717],
+        'Lon': [110.4167, 110.2042, 109.7292, 109.6753, 109.3842, 109.1403, 109.0428]
+    })
+
+
+@_cached
+def load_trend_data():
+    """Tren realisasi investasi per provinsi 2016-2024 (Triliun)."""
+    table = read_projects(columns=['Tahun', 'Provinsi', 'Investasi'])
+    if table is not None:
+        totals = table.group_by(['Tahun', 'Provinsi']).aggregate([('Investasi', 'sum')]).to_pandas()
+        trend = totals.pivot(index='Tahun', columns='Provinsi', values='Investasi_sum')
+        return trend.sort_index().reset_index().rename_axis(columns=None)
+
+    years = list(range(2016, 2025))
+    return pd.DataFrame({
+        'Tahun': years,
+        'DK Jakarta': [8, 20, 18, 20, 18, 25, 15, 16, 25],
+        'Jabar': [15, 9, 8, 9, 10, 6, 4, 3, 18],
+        'Jateng': [20, 19, 19, 18, 6, 5, 5, 2, 8],
+        'DIY': [28, 28, 26, 25, 22, 20, 18, 16, 15]
+    })
+
+
+def _sample_project_table():
+    return pd.DataFrame({
+        'Kabupaten/Kota': ['Semarang', 'Kendal', 'Batang'],
+        'Nilai Indikator': [97.5, 96.3, 94.3],
+        'Ranking': [1, 2, 3],
+        'Realisasi (T)': ['85.5 T', '47.2 T', '38.4 T']
+    })
+
+
+@_cached
+def load_project_table():
+    """Daftar indikasi proyek investasi."""
+    return fetch_table('project_table')
+
+
+@_cached
+def load_kpi_data():
+    """Kartu KPI nilai investasi masuk (kolom 3 tab Investasi)."""
+    return [
+        {"label": "Nilai Investasi Masuk", "value": "85,0 T", "suffix": "85,6 T*"},
+        {"label": "Realisasi PMA", "value": "47,2 T", "suffix": ""},
+        {"label": "Jumlah Proyek", "value": "1,250", "suffix": "1,24 T"},
+        {"label": "Rasio Investasi terhadap", "value": "29,9 %", "suffix": "29,8 %"},
+        {"label": "Tingkat Kepatuhan OSS", "value": "81,2 %", "suffix": ""}
+    ]
+
+
+# ============= INDIKATOR UTAMA =============
+
+@_cached
+def load_stats_data():
+    """Indikator makro utama beserta perubahan dan targetnya."""
+    return {
+        'Laju Pertumbuhan Ekonomi': {'value': 4.95, 'change': -0.40, 'target': '5.30 - 6.60'},
+        'Tingkat Kemiskinan': {'value': 10.47, 'change': -2.79, 'target': '9.50 - 10.00'},
+        'Indeks Pembangunan Manusia': {'value': 73.88, 'change': 2.79, 'target': 'Target RKP 2024'},
+        'Tingkat Pengangguran Terbuka': {'value': 5.57, 'change': -2.79, 'target': '4.60 - 5.30'},
+        'Rasio Gini': {'value': 0.369, 'change': -2.79, 'target': 'Target RKP 2024'}
+    }
+
+
+# ============= DATA KESEHATAN =============
+
+def _sample_health_facilities():
+    return pd.DataFrame({
+        'Jenis Fasilitas': ['RS Pemerintah', 'RS Swasta', 'Puskesmas', 'Klinik'],
+        'Jumlah': [1200, 2800, 9500, 15000]
+    })
+
+
+@_cached
+def load_health_facilities():
+    """Jumlah fasilitas kesehatan per jenis."""
+    return fetch_table('health_facilities')
+
+
+def _sample_vaccination_data():
+    return pd.DataFrame({
+        'Provinsi': ['DKI Jakarta', 'Jawa Barat', 'Jawa Tengah', 'Jawa Timur', 'Sumatera Utara'],
+        'Cakupan (%)': [95.2, 87.3, 91.8, 89.4, 84.7]
+    })
+
+
+@_cached
+def load_vaccination_data():
+    """Cakupan vaksinasi per provinsi."""
+    return fetch_table('vaccination_data')
+
+
+# ============= DATA TRANSPORTASI =============
+
+def _sample_transport_data():
+    return pd.DataFrame({
+        'Moda': ['Bus', 'KRL', 'MRT', 'LRT', 'Angkot'],
+        'Penumpang/Hari': [150000, 800000, 120000, 80000, 200000]
+    })
+
+
+@_cached
+def load_transport_data():
+    """Jumlah penumpang harian per moda transportasi publik."""
+    return fetch_table('transport_data')
+
+
+def _sample_road_condition():
+    return pd.DataFrame({
+        'Kondisi': ['Baik', 'Sedang', 'Rusak Ringan', 'Rusak Berat'],
+        'Persentase': [45, 30, 20, 5]
+    })
+
+
+@_cached
+def load_road_condition():
+    """Persentase kondisi jalan."""
+    return fetch_table('road_condition')
+
+
+# ============= DATA INFRASTRUKTUR =============
+
+def _sample_infra_projects():
+    return pd.DataFrame({
+        'Sektor': ['Jalan Tol', 'Bandara', 'Pelabuhan', 'Bendungan', 'Pembangkit Listrik'],
+        'Anggaran (Triliun)': [85.5, 45.2, 32.8, 28.6, 67.9],
+        'Progress (%)': [78, 65, 82, 91, 55]
+    })
+
+
+@_cached
+def load_infra_projects():
+    """Anggaran dan progres proyek infrastruktur per sektor."""
+    return fetch_table('infra_projects')
+
+
+def _sample_energy_data():
+    return pd.DataFrame({
+        'Bulan': pd.date_range('2024-01-01', periods=12, freq='M'),
+        'Konsumsi (TWh)': np.random.uniform(15, 25, 12)
+    })
+
+
+@_cached
+def load_energy_data():
+    """Konsumsi energi bulanan tahun 2024."""
+    return fetch_table('energy_data')
+
+
+# ============= KUBUS AGREGASI (ROLLUP) =============
+
+# Nilai kunci untuk dimensi yang tidak difilter ("semua")
+ALL = '*'
+CUBE_DIMENSIONS = ['Provinsi', 'Kabupaten/Kota', 'Sektor', 'Jenis']
+GRANULARITIES = ['Bulanan', 'Triwulanan', 'Tahunan']
+# Banyak baris maksimum yang diagregasi dalam satu langkah add()
+CUBE_CHUNK_ROWS = 1_000_000
+
+
+def _period_codes(df, periode):
+    """Kode periode numerik yang dapat diurutkan: 2024, 20241 (TW1), 202401."""
+    tahun = df['Tahun'].to_numpy(dtype=np.int64)
+    bulan = df['Bulan'].fillna(12).to_numpy(dtype=np.int64)
+    if periode == 'Tahunan':
+        return tahun
+    if periode == 'Triwulanan':
+        return tahun * 10 + (bulan - 1) // 3 + 1
+    return tahun * 100 + bulan
+
+
+def period_label(code, periode):
+    """Label tampilan untuk kode periode dari _period_codes()."""
+    if periode == 'Tahunan':
+        return str(code)
+    if periode == 'Triwulanan':
+        return f"{code // 10} TW{code % 10}"
+    return f"{code // 100}-{code % 100:02d}"
+
+
+class RollupCube:
+    """Kubus agregasi Investasi (jumlah dan banyak proyek) yang diperbarui bertahap.
+
+    Setiap sel dikunci dengan (periode, Provinsi, Kabupaten/Kota, Sektor, Jenis);
+    dimensi yang tidak difilter bernilai ALL. Data baru cukup ditambahkan dengan
+    add() tanpa menghitung ulang seluruh tabel fakta, dan pembacaan sel adalah
+    lookup dict.
+    """
+
+    def __init__(self):
+        self._cells = {}
+        self._members = {dim: set() for dim in CUBE_DIMENSIONS}
+        self._files = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.rows = 0
+        self.sample = False
+
+    def __getstate__(self):
+        # Kunci tidak dapat di-pickle; dibuat baru saat kubus dimuat dari cache bersama
+        state = self.__dict__.copy()
+        del state['_lock'], state['_sync_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def add(self, df):
+        """Tambahkan satu batch baris proyek ke kubus."""
+        if df.empty:
+            return
+        df = df.copy()
+        for dim in CUBE_DIMENSIONS:
+            if dim not in df:
+                df[dim] = None
+        if 'Bulan' not in df:
+            df['Bulan'] = 12
+
+        updates = []
+        for periode in GRANULARITIES:
+            df['_periode'] = _period_codes(df, periode)
+            for n in range(len(CUBE_DIMENSIONS) + 1):
+                for dims in itertools.combinations(CUBE_DIMENSIONS, n):
+                    grouped = df.groupby(list(dims) + ['_periode'])['Investasi'].agg(['sum', 'count'])
+                    for idx, total, count in zip(grouped.index, grouped['sum'], grouped['count']):
+                        idx = idx if isinstance(idx, tuple) else (idx,)
+                        values = dict(zip(dims, idx[:-1]))
+                        key = (periode,) + tuple(values.get(dim, ALL) for dim in CUBE_DIMENSIONS)
+                        updates.append((key, idx[-1], total, count))
+
+        with self._lock:
+            for key, code, total, count in updates:
+                cell = self._cells.setdefault(key, {}).setdefault(code, [0.0, 0])
+                cell[0] += total
+                cell[1] += count
+            for dim in CUBE_DIMENSIONS:
+                self._members[dim].update(df[dim].dropna().unique())
+            self.rows += len(df)
+
+    def sync(self, dataset):
+        """Tambahkan file Parquet yang belum pernah masuk ke kubus."""
+        if dataset is None:
+            return
+        with self._sync_lock:
+            self._sync_files([f for f in dataset.files if f not in self._files])
+
+    def _sync_files(self, new_files):
+        if not new_files:
+            return
+        fresh = files_dataset(new_files)
+        columns = CUBE_DIMENSIONS + ['Tahun', 'Bulan', 'Investasi']
+        # Batch kecil dari tiap fragmen digabung menjadi potongan besar agar
+        # jumlah groupby tetap sedikit
+        buffered, buffered_rows = [], 0
+        for batch in fresh.to_batches(columns=columns):
+            buffered.append(batch)
+            buffered_rows += batch.num_rows
+            if buffered_rows >= CUBE_CHUNK_ROWS:
+                self.add(pa.Table.from_batches(buffered).to_pandas())
+                buffered, buffered_rows = [], 0
+        if buffered:
+            self.add(pa.Table.from_batches(buffered).to_pandas())
+        self._files.update(new_files)
+
+    def members(self, dim):
+        """Nilai-nilai yang pernah muncul pada satu dimensi, terurut."""
+        with self._lock:
+            return sorted(self._members[dim])
+
+    def cell(self, periode, provinsi=ALL, kabupaten=ALL, sektor=ALL, jenis=ALL):
+        """Salinan dict {kode periode: [jumlah investasi, banyak proyek]} untuk satu sel.
+
+        add() dapat mengubah sel dari thread ingest kapan saja; pembaca selalu
+        mendapat salinan yang diambil di bawah kunci.
+        """
+        with self._lock:
+            cell = self._cells.get((periode, provinsi, kabupaten, sektor, jenis), {})
+            return {code: list(values) for code, values in cell.items()}
+
+    def region_cells(self, periode):
+        """Salinan sel semua kombinasi (Provinsi, Kabupaten/Kota), termasuk ALL, untuk satu periode."""
+        with self._lock:
+            return {
+                (key[1], key[2]): dict(cell)
+                for key, cell in self._cells.items()
+                if key[0] == periode and key[3] == ALL and key[4] == ALL
+            }
+
+    def series(self, periode, provinsi=ALL, kabupaten=ALL, sektor=ALL, jenis=ALL):
+        """Deret waktu jumlah Investasi untuk satu sel, diindeks label periode."""
+        return _cell_series(self.cell(periode, provinsi, kabupaten, sektor, jenis), periode)
+
+
+def _sample_facts():
+    """Tabel fakta dari data contoh tren (total tahunan per provinsi)."""
+    facts = load_trend_data().melt(id_vars='Tahun', var_name='Provinsi', value_name='Investasi')
+    facts['Bulan'] = 12
+    return facts
+
+
+def _build_cube():
+    cube = RollupCube()
+    dataset = project_dataset()
+    if dataset is None:
+        cube.add(_sample_facts())
+        cube.sample = True
+    else:
+        cube.sync(dataset)
+    return cube
+
+
+@st.cache_resource(show_spinner=False)
+def _investment_cube():
+    # Kubus untuk versi data yang sama dibangun sekali untuk semua worker
+    return sharedcache.get_or_compute('kubus', 'investasi', data_version(), _build_cube)
+
+
+def investment_cube():
+    """Kubus agregasi bersama untuk semua sesi, disinkronkan dengan penyimpanan Parquet."""
+    cube = _investment_cube()
+    dataset = project_dataset()
+    if cube.sample and dataset is not None:
+        # Data proyek asli baru tersedia: buang kubus dari data contoh
+        _investment_cube.clear()
+        cube = _investment_cube()
+    cube.sync(dataset)
+    return cube
+
+
+def _cube_cell(cube, periode, provinsi=ALL, kabupaten=None, jenis=ALL):
+    # Gabungan sel untuk beberapa Kabupaten/Kota; None berarti semua (ALL)
+    if kabupaten is None or not cube.members('Kabupaten/Kota'):
+        return cube.cell(periode, provinsi=provinsi, jenis=jenis)
+    combined = {}
+    for kab in kabupaten:
+        for code, (total, count) in cube.cell(periode, provinsi=provinsi, kabupaten=kab, jenis=jenis).items():
+            cell = combined.setdefault(code, [0.0, 0])
+            cell[0] += total
+            cell[1] += count
+    return combined
+
+
+def _cell_series(cell, periode):
+    codes = sorted(cell)
+    return pd.Series(
+        [cell[c][0] for c in codes],
+        index=[period_label(c, periode) for c in codes],
+        dtype=float
+    )
+
+
+def cube_trend(periode, kabupaten=None):
+    """Tren Investasi per provinsi dari kubus (kolom 'Periode' + satu kolom per provinsi).
+
+    `kabupaten` membatasi tren ke Kabupaten/Kota tertentu (mis. dari
+    query.Selection); diabaikan bila kubus tidak memiliki dimensi kabupaten.
+    """
+    cube = investment_cube()
+    trend = pd.DataFrame({
+        provinsi: _cell_series(_cube_cell(cube, periode, provinsi, kabupaten), periode)
+        for provinsi in cube.members('Provinsi')
+    })
+    trend = trend.dropna(axis=1, how='all')
+    return trend.rename_axis('Periode').reset_index()
+
+
+def cube_kpi(periode, kabupaten=None):
+    """Nilai KPI periode terakhir dari kubus, atau None bila belum ada data proyek."""
+    cube = investment_cube()
+    if cube.sample:
+        return None
+    total = _cube_cell(cube, periode, kabupaten=kabupaten)
+    if not total:
+        return None
+    codes = sorted(total)
+    latest = codes[-1]
+    previous = total[codes[-2]][0] if len(codes) > 1 else None
+    pma = _cube_cell(cube, periode, kabupaten=kabupaten, jenis='PMA').get(latest, [0.0, 0])
+    return {
+        'periode': period_label(latest, periode),
+        'investasi': total[latest][0],
+        'investasi_sebelumnya': previous,
+        'pma': pma[0],
+        'proyek': total[latest][1],
+    }
+
+
+def kpi_cards(cards, periode, kabupaten=None):
+    """Salinan kartu KPI (lihat load_kpi_data) dengan tiga kartu pertama diisi dari kubus.
+
+    Kartu dikembalikan apa adanya bila belum ada data proyek.
+    """
+    cards = [dict(card) for card in cards]
+    kpi = cube_kpi(periode, kabupaten)
+    if kpi is not None:
+        previous = kpi['investasi_sebelumnya']
+        cards[0]["value"] = f"{kpi['investasi']:.1f} T".replace(".", ",")
+        cards[0]["suffix"] = f"{previous:.1f} T*".replace(".", ",") if previous is not None else ""
+        cards[1]["value"] = f"{kpi['pma']:.1f} T".replace(".", ",")
+        cards[2]["value"] = f"{kpi['proyek']:,}"
+        cards[2]["suffix"] = kpi['periode']
+    return cards
+
+
+# ============= SNAPSHOT BERSAMA =============
+
+# Sumber snapshot beserta dependensinya, dimuat bersamaan oleh loader.Orchestrator.
+# 'proyek' dan 'database' menyiapkan handle Parquet dan pool SQLite yang dipakai
+# loader lain (keduanya di-cache, jadi loader cukup memanggilnya lagi).
+SNAPSHOT_SOURCES = {
+    'proyek': ((), project_dataset),
+    'database': ((), database_pool),
+    'jateng_data': (('proyek',), load_jateng_data),
+    'trend_data': (('proyek',), load_trend_data),
+    'project_table': (('database',), load_project_table),
+    'kpi_data': ((), load_kpi_data),
+    'stats_data': ((), load_stats_data),
+    'health_facilities': (('database',), load_health_facilities),
+    'vaccination_data': (('database',), load_vaccination_data),
+    'transport_data': (('database',), load_transport_data),
+    'road_condition': (('database',), load_road_condition),
+    'infra_projects': (('database',), load_infra_projects),
+    'energy_data': (('database',), load_energy_data),
+}
+# Dataset yang dibaca sesi dari snapshot
+SNAPSHOT_TABLES = [name for name in SNAPSHOT_SOURCES if name not in ('proyek', 'database')]
+# Lama halaman menunggu satu dataset sebelum menampilkan placeholder (detik)
+SNAPSHOT_TIMEOUT = float(os.environ.get("DASHBOARD_LOAD_TIMEOUT", loader.DEFAULT_TIMEOUT))
+
+
+def _readonly_frame(df):
+    # Setiap kolom disalin sekali ke array sendiri yang ditandai read-only;
+    # copy=False agar pandas tidak menggabungkannya kembali ke blok yang dapat ditulis.
+    # Kolom kategori tetap kategori: hanya array kodenya yang disalin.
+    columns = {}
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            categorical = df[name].array
+            values = categorical.codes.copy()
+            values.setflags(write=False)
+            columns[name] = pd.Categorical.from_codes(values, dtype=categorical.dtype)
+            continue
+        values = df[name].to_numpy(copy=True)
+        values.setflags(write=False)
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _object_bytes(values):
+    return values.nbytes + sum(sys.getsizeof(item) for item in values)
+
+
+def _frame_bytes(df):
+    # memory_usage(deep=True) pandas menolak array objek read-only, jadi isi
+    # kolom objek (string) dihitung sendiri. Tabel nilai kategori dipakai
+    # bersama semua dataset sehingga hanya kodenya yang dihitung.
+    total = 0
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            total += df[name].array.codes.nbytes
+            continue
+        values = df[name].to_numpy()
+        total += _object_bytes(values) if values.dtype == object else values.nbytes
+    return total
+
+
+def _plain_bytes(df):
+    # Ukuran DataFrame bila kolomnya disimpan seperti di sumber: kategori sebagai
+    # string objek dan UNIT_COLUMNS sebagai teks bersatuan ('85.5 T')
+    total = 0
+    for name in df.columns:
+        if isinstance(df[name].dtype, pd.CategoricalDtype):
+            total += _object_bytes(df[name].to_numpy(dtype=object))
+        elif name in UNIT_COLUMNS:
+            total += _object_bytes(np.array([f"{value} {UNIT_COLUMNS[name]}" for value in df[name]], dtype=object))
+        else:
+            total += _frame_bytes(df[[name]])
+    return total
+
+
+def _freeze(value):
+    """Salinan tak dapat diubah dari hasil loader (DataFrame, dict, atau list)."""
+    if isinstance(value, pd.DataFrame):
+        return _readonly_frame(value)
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Snapshot:
+    """Versi tetap seluruh dataset dashboard, dipakai bersama semua sesi.
+
+    Dataset dibaca sebagai atribut (mis. `snapshot.jateng_data`). DataFrame
+    berisi array read-only sehingga sesi dapat memakainya langsung tanpa
+    menyalin; filter per sesi dilakukan dengan mask. Snapshot tidak pernah
+    diubah setelah dibuat: data baru selalu menjadi snapshot baru.
+
+    Dataset dimuat bersamaan di latar. Membaca atribut menunggu paling lama
+    sampai batas waktu datasetnya, lalu melempar loader.Pending bila belum
+    selesai; pakai ready()/wait() untuk menampilkan placeholder.
+    """
+
+    def __init__(self, version, batch):
+        self.version = version
+        self.created = time.time()
+        self._batch = batch
+
+    def __getattr__(self, name):
+        if name not in SNAPSHOT_TABLES:
+            raise AttributeError(name)
+        return self.__dict__['_batch'].get(name)
+
+    def ready(self, *names):
+        """True bila semua dataset `names` sudah selesai dimuat (berhasil atau gagal)."""
+        return all(self._batch.ready(name) for name in names)
+
+    def wait(self, *names):
+        """Tunggu `names` sampai batas waktunya; True bila semuanya tersedia."""
+        try:
+            for name in names:
+                self._batch.get(name)
+        except loader.Pending:
+            return False
+        return True
+
+    def join(self):
+        """Tunggu semua dataset tanpa batas waktu (mis. untuk proses offline)."""
+        self._batch.wait()
+        return self
+
+    def failed(self):
+        """Nama dataset yang pemuatnya gagal."""
+        return [
+            name for name in SNAPSHOT_TABLES
+            if self._batch.ready(name) and self._batch.exception(name) is not None
+        ]
+
+    def load_seconds(self):
+        """Lama pemuatan per sumber yang sudah selesai (detik)."""
+        return dict(self._batch.durations)
+
+    def memory_report(self):
+        """Ukuran DataFrame di snapshot (byte), per dataset yang sudah dimuat.
+
+        {dataset: {'sumber': ukuran bila disimpan sebagai objek seperti di
+        sumber, 'ringkas': ukuran dengan kolom kategori dan angka bertipe}}.
+        """
+        tables = {name: self._batch.get(name, 0) for name in SNAPSHOT_TABLES
+                  if self._batch.ready(name) and self._batch.exception(name) is None}
+        return {
+            name: {'sumber': _plain_bytes(table), 'ringkas': _frame_bytes(table)}
+            for name, table in tables.items()
+            if isinstance(table, pd.DataFrame)
+        }
+
+
+def _frozen(load):
+    return lambda: _freeze(load())
+
+
+class SnapshotStore:
+    """Pemegang snapshot aktif per proses.
+
+    Pembaca cukup mengambil referensi `current()` tanpa kunci. Snapshot pertama
+    langsung dipakai selagi datasetnya dimuat, sehingga halaman dapat tampil
+    sebagian; snapshot yang pemuatnya gagal dibangun ulang pada pemanggilan
+    berikutnya. publish() menunggu snapshot baru selesai dimuat seluruhnya lalu
+    menukar referensinya sekaligus, sehingga sesi yang masih memakai versi lama
+    tidak terganggu dan versi lama dibebaskan setelah tidak ada lagi yang memakainya.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+        self._loader = loader.Orchestrator(
+            loader.Source(
+                name,
+                _frozen(load) if name in SNAPSHOT_TABLES else load,
+                deps,
+                SNAPSHOT_TIMEOUT
+            )
+            for name, (deps, load) in SNAPSHOT_SOURCES.items()
+        )
+
+    def _build(self, wait):
+        version = 1 if self._current is None else self._current.version + 1
+        batch = self._loader.start()
+        if wait:
+            batch.wait()
+        return Snapshot(version, batch)
+
+    def current(self):
+        snapshot = self._current
+        if snapshot is None or snapshot.failed():
+            with self._lock:
+                if self._current is None or self._current.failed():
+                    self._current = self._build(wait=False)
+                snapshot = self._current
+        return snapshot
+
+    def publish(self):
+        """Muat ulang semua dataset dan jadikan snapshot aktif setelah selesai."""
+        with self._lock:
+            snapshot = self._build(wait=True)
+            self._current = snapshot
+        return snapshot
+
+
+@st.cache_resource(show_spinner=False)
+def snapshot_store():
+    return SnapshotStore()
+
+
+def snapshot():
+    """Snapshot data aktif; ambil sekali per rerun agar semua widget memakai versi yang sama."""
+    return snapshot_store().current()
+
+
+def publish_snapshot():
+    """Terbitkan snapshot baru setelah cache loader dibersihkan (refresh/data baru)."""
+    return snapshot_store().publish()
+
+
+def clear_cache():
+    """Hapus seluruh cache loader sehingga data dimuat ulang pada rerun berikutnya.
+
+    Cache bersama ikut dikosongkan agar worker lain juga memuat ulang.
+    """
+    for cached_loader in _LOADERS:
+        cached_loader.clear()
+    project_dataset.clear()
+    sharedcache.shared_cache().clear()
+
+
+if __name__ == "__main__":
+    # Penggunaan: python data.py ekspor_2024.csv [ekspor_lain.csv ...]
+    for path in sys.argv[1:]:
+        status = "dimasukkan" if ingest_csv(path) else "sudah ada, dilewati"
+        print(f"{path}: {status}")
@@ -0,0 +1,145 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import data
+
+# Banyak ekspor yang boleh berjalan bersamaan di satu proses; permintaan lain antre
+EXPORT_WORKERS = 2
+EXPORT_TIMEOUT = 600
+EXPORT_CHUNK_ROWS = 100_000
+# File ekspor di bawah ukuran ini tetap di memori, di atasnya dipindah ke disk
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# Batas baris satu sheet Excel (termasuk header)
+XLSX_MAX_ROWS = 1_048_576
+
+
+def _spool():
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+
+def write_csv(batches):
+    """Tulis potongan DataFrame ke file CSV sementara satu per satu."""
+    out = _spool()
+    header = True
+    for df in batches:
+        out.write(df.to_csv(index=False, header=header).encode("utf-8"))
+        header = False
+    out.seek(0)
+    return out
+
+
+def write_xlsx(batches):
+    """Tulis potongan DataFrame ke XLSX dengan mode constant_memory xlsxwriter.
+
+    Baris ditulis berurutan dan langsung dibuang dari memori; sheet baru dibuat
+    bila batas baris Excel terlampaui.
+    """
+    # Diimpor saat dipakai: sebagian besar sesi tidak pernah mengekspor
+    import xlsxwriter
+
+    out = _spool()
+    workbook = xlsxwriter.Workbook(out, {"constant_memory": True, "nan_inf_to_errors": True})
+    sheet, row = None, 0
+    for df in batches:
+        for values in df.itertuples(index=False, name=None):
+            if sheet is None or row >= XLSX_MAX_ROWS:
+                sheet = workbook.add_worksheet(f"Data {len(workbook.worksheets()) + 1}")
+                sheet.write_row(0, 0, list(df.columns))
+                row = 1
+            sheet.write_row(row, 0, values)
+            row += 1
+    if sheet is None:
+        workbook.add_worksheet("Data 1")
+    workbook.close()
+    out.seek(0)
+    return out
+
+
+def write_pdf(batches, flt=None):
+    """Laporan PDF ringkas: total per kabupaten/kota dan sebaran status.
+
+    Data diagregasi per potongan, sehingga ukuran laporan tidak bergantung pada
+    banyaknya baris proyek.
+    """
+    per_region = pd.Series(dtype=float)
+    per_status = pd.Series(dtype=float)
+    rows = 0
+    for df in batches:
+        rows += len(df)
+        per_region = per_region.add(df.groupby('Kabupaten/Kota', observed=True)['Investasi'].sum(), fill_value=0)
+        per_status = per_status.add(df.groupby('Status', observed=True)['Investasi'].sum(), fill_value=0)
+    per_region = per_region.sort_values(ascending=False)
+
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    out = _spool()
+    with PdfPages(out) as pdf:
+        # Figure dibuat tanpa pyplot agar aman dipakai dari thread pool ekspor
+        fig = Figure(figsize=(8.27, 11.69))
+        ax_text, ax_bar = fig.subplots(2, 1, gridspec_kw={"height_ratios": [1, 3]})
+        ax_text.axis("off")
+        lines = [
+            "Laporan Investasi Daerah",
+            f"Dibuat: {datetime.now().strftime('%d %B %Y %H:%M')}",
+            f"Wilayah: {', '.join(flt.wilayah) if flt is not None and flt.wilayah else 'Semua'}",
+            f"Ambang batas investasi: {flt.threshold if flt is not None and flt.threshold is not None else '-'} T",
+            f"Jumlah baris: {rows:,}",
+            f"Total investasi: {per_region.sum():,.1f} T",
+        ]
+        ax_text.text(0, 1, "\n".join(lines), va="top", fontsize=11)
+        top = per_region.head(20)
+        ax_bar.barh(top.index[::-1], top.values[::-1], color="#3182ce")
+        ax_bar.set_xlabel("Investasi (T)")
+        ax_bar.set_title("Investasi per Kabupaten/Kota")
+        fig.tight_layout()
+        pdf.savefig(fig)
+
+        if not per_status.empty:
+            fig = Figure(figsize=(8.27, 5))
+            ax = fig.subplots()
+            ax.pie(per_status.values, labels=per_status.index, autopct="%1.1f%%")
+            ax.set_title("Investasi per Status")
+            pdf.savefig(fig)
+    out.seek(0)
+    return out
+
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "PDF Report": ("pdf", "application/pdf"),
+}
+
+
+@st.cache_resource(show_spinner=False)
+def export_executor():
+    """Pool thread bersama untuk semua sesi yang membatasi ekspor serentak."""
+    return ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export")
+
+
+def _build_export(export_format, flt):
+    batches = data.iter_jateng_batches(flt, batch_rows=EXPORT_CHUNK_ROWS)
+    if export_format == "CSV":
+        return write_csv(batches)
+    if export_format == "Excel":
+        return write_xlsx(batches)
+    return write_pdf(batches, flt)
+
+
+def export_file(export_format, flt=None):
+    """Buat file ekspor di pool ekspor dan kembalikan objek file yang siap dibaca.
+
+    `flt` adalah query.DashboardFilter yang sedang aktif di sidebar.
+    """
+    future = export_executor().submit(_build_export, export_format, flt)
+    return future.result(timeout=EXPORT_TIMEOUT)
+
+
+def export_filename(export_format):
+    extension, _ = EXPORT_FORMATS[export_format]
+    return f"investasi_data_{datetime.now().strftime('%Y%m%d')}.{extension}"
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data
+
+# Banyak periode yang diproyeksikan per granularitas
+HORIZON = {'Tahunan': 3, 'Triwulanan': 4, 'Bulanan': 6}
+# Tingkat kepercayaan pita prediksi
+CONFIDENCE = 0.95
+
+
+def _ordinal(codes, periode):
+    """Kode periode (lihat data._period_codes) -> nomor urut tanpa celah."""
+    codes = np.asarray(codes, dtype=np.int64)
+    if periode == 'Tahunan':
+        return codes
+    if periode == 'Triwulanan':
+        return codes // 10 * 4 + codes % 10 - 1
+    return codes // 100 * 12 + codes % 100 - 1
+
+
+def _code(ordinals, periode):
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if periode == 'Tahunan':
+        return ordinals
+    if periode == 'Triwulanan':
+        return ordinals // 4 * 10 + ordinals % 4 + 1
+    return ordinals // 12 * 100 + ordinals % 12 + 1
+
+
+class TrendModel:
+    """Tren linear (OLS) untuk semua deret wilayah satu granularitas sekaligus.
+
+    Setiap baris matriks adalah satu deret (Provinsi, Kabupaten/Kota) dari kubus
+    agregasi, kolomnya periode berurutan (periode tanpa proyek bernilai 0).
+    Koefisien dan residu dihitung dengan operasi matriks NumPy. Karena keduanya
+    linear terhadap data, model untuk gabungan beberapa kabupaten/kota cukup
+    menjumlahkan barisnya, tanpa fitting ulang.
+    """
+
+    def __init__(self, periode, keys, ordinals, values):
+        self.periode = periode
+        self.rows = {key: i for i, key in enumerate(keys)}
+        self.ordinals = ordinals
+        x = ordinals - ordinals.mean()
+        self._x_mean = ordinals.mean()
+        self._sxx = float((x ** 2).sum())
+        self.intercept = values.mean(axis=1)
+        self.slope = values @ x / self._sxx if self._sxx else np.zeros(len(values))
+        self.residuals = values - (self.intercept[:, None] + self.slope[:, None] * x)
+
+    def project(self, keys, horizon):
+        """Proyeksi jumlah deret `keys`: (kode periode, prediksi, batas bawah, batas atas)."""
+        rows = [self.rows[key] for key in keys if key in self.rows]
+        if not rows:
+            return None
+        n = len(self.ordinals)
+        future = self.ordinals[-1] + np.arange(1, horizon + 1)
+        predicted = self.intercept[rows].sum() + self.slope[rows].sum() * (future - self._x_mean)
+
+        if n > 2 and self._sxx:
+            from scipy import stats
+
+            residuals = self.residuals[rows].sum(axis=0)
+            sigma = np.sqrt((residuals ** 2).sum() / (n - 2))
+            spread = sigma * np.sqrt(1 + 1 / n + (future - self._x_mean) ** 2 / self._sxx)
+            margin = stats.t.ppf((1 + CONFIDENCE) / 2, n - 2) * spread
+        else:
+            margin = np.full(horizon, np.nan)
+        return _code(future, self.periode), predicted, predicted - margin, predicted + margin
+
+
+def fit(periode):
+    """Fit model tren untuk semua deret wilayah di kubus investasi."""
+    cells = data.investment_cube().region_cells(periode)
+    cells = {key: cell for key, cell in cells.items() if key[0] != data.ALL and cell}
+    if not cells:
+        return None
+
+    keys = list(cells)
+    codes = sorted({code for cell in cells.values() for code in cell})
+    ordinals = np.arange(_ordinal(codes[0], periode), _ordinal(codes[-1], periode) + 1)
+    values = np.zeros((len(keys), len(ordinals)))
+    for row, key in enumerate(keys):
+        cell = cells[key]
+        cols = _ordinal(list(cell), periode) - ordinals[0]
+        values[row, cols] = [total for total, _ in cell.values()]
+    return TrendModel(periode, keys, ordinals.astype(float), values)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2 * len(HORIZON))
+def trend_model(periode, version):
+    """Model bersama per granularitas dan versi data; tidak di-fit ulang per rerun."""
+    return fit(periode)
+
+
+def trend_forecast(periode, provinsi, kabupaten=None):
+    """Proyeksi per provinsi dengan pita kepercayaan.
+
+    DataFrame berkolom Periode, Provinsi, Prediksi, Bawah, Atas. `kabupaten`
+    membatasi proyeksi ke gabungan Kabupaten/Kota tertentu, sama seperti
+    data.cube_trend().
+    """
+    model = trend_model(periode, data.data_version())
+    if model is None:
+        return None
+    by_kabupaten = kabupaten is not None and any(key[1] != data.ALL for key in model.rows)
+    frames = []
+    for prov in provinsi:
+        keys = [(prov, kab) for kab in kabupaten] if by_kabupaten else [(prov, data.ALL)]
+        projection = model.project(keys, HORIZON[periode])
+        if projection is None:
+            continue
+        codes, predicted, lower, upper = projection
+        # Investasi tidak mungkin negatif
+        predicted, lower = np.maximum(predicted, 0), np.maximum(lower, 0)
+        frames.append(pd.DataFrame({
+            'Periode': [data.period_label(code, periode) for code in codes],
+            'Provinsi': prov,
+            'Prediksi': predicted,
+            'Bawah': lower,
+            'Atas': upper,
+        }))
+    return pd.concat(frames, ignore_index=True) if frames else None
@@ -0,0 +1,170 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data
+import sharedcache
+
+# Tingkat zoom yang disediakan indeks; zoom lain dibulatkan ke yang terdekat
+ZOOM_LEVELS = list(range(5, 15))
+# Jarak antar-penanda (piksel) yang diinginkan setelah pengelompokan
+CELL_PX = 32
+TILE_PX = 256
+
+MAP_CENTER = {"lat": -6.9, "lon": 110.0}
+
+
+def cell_size(zoom):
+    """Ukuran sel grid (derajat) untuk satu tingkat zoom Web Mercator."""
+    return 360.0 / 2 ** zoom * CELL_PX / TILE_PX
+
+
+def viewport(center, zoom, width_px=800, height_px=400, margin=2.0):
+    """Batas (lat_min, lat_max, lon_min, lon_max) area peta yang terlihat.
+
+    `margin` memperlebar area agar penanda tetap ada saat peta digeser di browser.
+    """
+    deg_per_px = 360.0 / 2 ** zoom / TILE_PX
+    half_lon = width_px / 2 * deg_per_px * margin
+    half_lat = height_px / 2 * deg_per_px * margin
+    return (center["lat"] - half_lat, center["lat"] + half_lat,
+            center["lon"] - half_lon, center["lon"] + half_lon)
+
+
+class GridIndex:
+    """Indeks spasial grid atas titik proyek (Lat/Lon).
+
+    Untuk setiap tingkat zoom, nomor sel tiap titik dihitung sekali saat indeks
+    dibangun. Pengelompokan per zoom kemudian cukup beberapa np.bincount, termasuk
+    bila hanya sebagian titik yang dipilih (mask). Titik baru dapat ditambahkan
+    dengan extend() tanpa membangun ulang indeks.
+    """
+
+    def __init__(self, df, zooms=ZOOM_LEVELS):
+        self.zooms = list(zooms)
+        self._lock = threading.Lock()
+        self._state = None
+        self.extend(df)
+
+    def __getstate__(self):
+        return {'zooms': self.zooms, '_state': self._state}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def extend(self, df):
+        """Tambahkan titik baru; pembaca tetap melihat keadaan lama sampai selesai."""
+        with self._lock:
+            old = self._state
+            lat = df['Lat'].to_numpy(dtype=float)
+            lon = df['Lon'].to_numpy(dtype=float)
+            statuses = pd.Index([] if old is None else old['statuses'])
+            statuses = statuses.append(pd.Index(pd.unique(df['Status'].dropna().to_numpy(dtype=object))).difference(statuses))
+            status_codes = statuses.get_indexer(df['Status'])
+            regions = pd.Index([] if old is None else old['regions'])
+            regions = regions.append(pd.Index(pd.unique(df['Kabupaten/Kota'].dropna().to_numpy(dtype=object))).difference(regions))
+            region_codes = regions.get_indexer(df['Kabupaten/Kota'])
+
+            cells = {}
+            for zoom in self.zooms:
+                size = cell_size(zoom)
+                keys = (np.floor(lat / size).astype(np.int64) << 32) + np.floor(lon / size).astype(np.int64)
+                known = pd.Index([] if old is None else old['cell_keys'][zoom], dtype=np.int64)
+                ids = known.get_indexer(keys)
+                new_keys = pd.unique(keys[ids < 0])
+                ids[ids < 0] = len(known) + pd.Index(new_keys).get_indexer(keys[ids < 0])
+                cells[zoom] = (known.append(pd.Index(new_keys)).to_numpy(),
+                               ids if old is None else np.concatenate([old['cells'][zoom], ids]))
+
+            def stacked(name, values):
+                return values if old is None else np.concatenate([old[name], values])
+
+            self._state = {
+                'lat': stacked('lat', lat),
+                'lon': stacked('lon', lon),
+                'investasi': stacked('investasi', df['Investasi'].to_numpy(dtype=float)),
+                'names': stacked('names', df['Kabupaten/Kota'].to_numpy(dtype=object)),
+                'status_codes': stacked('status_codes', status_codes),
+                'statuses': statuses.to_numpy(dtype=object),
+                'region_codes': stacked('region_codes', region_codes),
+                'regions': regions.to_numpy(dtype=object),
+                'cell_keys': {zoom: keys for zoom, (keys, _) in cells.items()},
+                'cells': {zoom: ids for zoom, (_, ids) in cells.items()},
+            }
+
+    def __len__(self):
+        return len(self._state['lat'])
+
+    def columns(self):
+        """(Kabupaten/Kota, Investasi) dari keadaan yang sama, untuk evaluasi filter."""
+        state = self._state
+        return state['names'], state['investasi']
+
+    def region_totals(self, mask=None):
+        """Jumlah Investasi per Kabupaten/Kota (Series) untuk titik terpilih."""
+        state = self._state
+        codes, investasi = state['region_codes'], state['investasi']
+        if mask is not None:
+            codes, investasi = codes[mask], investasi[mask]
+        known = codes >= 0
+        totals = np.bincount(codes[known], weights=investasi[known], minlength=len(state['regions']))
+        count = np.bincount(codes[known], minlength=len(state['regions']))
+        return pd.Series(totals[count > 0], index=state['regions'][count > 0], name='Investasi')
+
+    def nearest_zoom(self, zoom):
+        return min(self.zooms, key=lambda z: abs(z - zoom))
+
+    def clusters(self, zoom, mask=None, bounds=None):
+        """Penanda teragregasi untuk satu zoom.
+
+        Mengembalikan DataFrame dengan kolom Kabupaten/Kota (nama titik atau
+        "N proyek"), Status dominan, Investasi (jumlah), Jumlah, Lat, Lon.
+        """
+        state = self._state
+        zoom = self.nearest_zoom(zoom)
+        inverse, n_cells = state['cells'][zoom], len(state['cell_keys'][zoom])
+        rows = np.arange(len(inverse)) if mask is None else np.flatnonzero(mask)
+        cell = inverse[rows]
+
+        count = np.bincount(cell, minlength=n_cells)
+        total = np.bincount(cell, weights=state['investasi'][rows], minlength=n_cells)
+        lat = np.bincount(cell, weights=state['lat'][rows], minlength=n_cells)
+        lon = np.bincount(cell, weights=state['lon'][rows], minlength=n_cells)
+
+        n_status = max(len(state['statuses']), 1)
+        status_count = np.bincount(
+            cell * n_status + state['status_codes'][rows],
+            minlength=n_cells * n_status
+        ).reshape(n_cells, n_status)
+
+        # Titik pertama di setiap sel, untuk nama penanda berisi satu proyek
+        first = np.zeros(n_cells, dtype=np.int64)
+        first[cell[::-1]] = rows[::-1]
+
+        keep = count > 0
+        count = count[keep]
+        markers = pd.DataFrame({
+            'Kabupaten/Kota': np.where(count == 1, state['names'][first[keep]],
+                                       [f"{n} proyek" for n in count]),
+            'Status': state['statuses'][status_count[keep].argmax(axis=1)],
+            'Investasi': total[keep],
+            'Jumlah': count,
+            'Lat': lat[keep] / count,
+            'Lon': lon[keep] / count,
+        })
+        if bounds is not None:
+            lat_min, lat_max, lon_min, lon_max = bounds
+            markers = markers[markers['Lat'].between(lat_min, lat_max)
+                              & markers['Lon'].between(lon_min, lon_max)]
+        return markers.reset_index(drop=True)
+
+
+@st.cache_resource(show_spinner=False)
+def map_index():
+    """Indeks grid bersama untuk data peta investasi, dibangun sekali per versi data."""
+    return sharedcache.get_or_compute(
+        'peta', 'grid', data.data_version(), lambda: GridIndex(data.load_jateng_data())
+    )
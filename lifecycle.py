@@ -0,0 +1,338 @@
+import bisect
+import heapq
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+import data
+import sharedcache
+
+# Tahap siklus proyek investasi, berurutan seperti di diagram alur
+IDENTIFIKASI = 'Identifikasi Potensi'
+REALISASI = 'Realisasi Proyek'
+PROMOSI = 'Promosi'
+MONITORING = 'Monitoring'
+STAGES = [IDENTIFIKASI, REALISASI, PROMOSI, MONITORING]
+# Tahap asal panah yang masuk ke tiap tahap di diagram alur; None untuk tahap awal
+FLOW = {IDENTIFIKASI: None, REALISASI: IDENTIFIKASI, PROMOSI: REALISASI, MONITORING: REALISASI}
+# Status di data proyek -> tahap. 'Nasional Imajiner' adalah proyek potensial yang
+# sudah ditawarkan di tingkat nasional, jadi masuk tahap Promosi
+STATUS_STAGES = {'Imajiner': IDENTIFIKASI, 'Nasional Imajiner': PROMOSI, 'Realisasi': REALISASI}
+# Proyek terealisasi pindah ke Monitoring setelah sekian bulan sejak bulan realisasinya
+# (dihitung terhadap bulan terbaru di data)
+MONITORING_MONTHS = 12
+# Tahap yang investasinya dihitung sebagai realisasi di tabel peringkat
+REALISED_STAGES = (REALISASI, MONITORING)
+# Tabel "Daftar Indikasi Proyek Investasi": peringkat Kabupaten/Kota satu provinsi
+RANKING_PROVINCE = 'Jawa Tengah'
+RANKING_SIZE = 10
+# Kartu "Ringkasan Bulan Ini" selama belum ada data proyek bulanan
+SAMPLE_SUMMARY = [
+    {"label": "Proyek Baru", "value": "47", "delta": "+12"},
+    {"label": "Investasi Baru", "value": "2.3T", "delta": "+0.8T"},
+]
+
+_COLUMNS = ['Provinsi', 'Kabupaten/Kota', 'Nama Proyek', 'Status', 'Investasi', 'Tahun', 'Bulan']
+
+
+class RankIndex:
+    """Urutan nama menurut nilai menurun, diperbarui per perubahan tanpa mengurutkan ulang.
+
+    Entri disimpan terurut sebagai (-nilai, nama): update() cukup satu pencarian
+    biner untuk membuang posisi lama dan satu sisipan, dan top() hanya membaca
+    awal daftar.
+    """
+
+    def __init__(self):
+        self._order = []
+        self._values = {}
+
+    def update(self, name, value):
+        old = self._values.get(name)
+        if old is not None:
+            del self._order[bisect.bisect_left(self._order, (-old, name))]
+        self._values[name] = value
+        bisect.insort(self._order, (-value, name))
+
+    def top(self, n, include=None):
+        """[(peringkat, nama, nilai)] untuk n teratas.
+
+        `include` membatasi nama yang dikembalikan tanpa mengubah peringkatnya.
+        """
+        result = []
+        for rank, (value, name) in enumerate(self._order, 1):
+            if include is None or name in include:
+                result.append((rank, name, -value))
+                if len(result) == n:
+                    break
+        return result
+
+
+def _month(tahun, bulan):
+    # Nomor bulan berurutan (tahun * 12 + bulan - 1); None bila tahun tidak diketahui
+    if tahun is None:
+        return None
+    return tahun * 12 + (12 if bulan is None else bulan) - 1
+
+
+def _month_label(month):
+    return data.period_label((month // 12) * 100 + month % 12 + 1, 'Bulanan')
+
+
+def _bump(counter, key, *deltas):
+    values = counter.setdefault(key, [0] * len(deltas))
+    for i, delta in enumerate(deltas):
+        values[i] += delta
+
+
+class ProjectLifecycle:
+    """Tahap setiap proyek beserta penghitung yang diperbarui per perpindahan tahap.
+
+    Setiap baris data proyek menempatkan proyeknya, dikunci dengan (Provinsi,
+    Kabupaten/Kota, Nama Proyek), pada tahap menurut STATUS_STAGES. Proyek yang
+    muncul lagi dengan status lain berpindah tahap; proyek di tahap Realisasi
+    pindah ke Monitoring setelah MONITORING_MONTHS bulan (antrean heap menurut
+    bulan realisasi). Setiap perpindahan hanya mengubah beberapa penghitung:
+    banyak proyek dan investasi per tahap, perpindahan antartahap, proyek baru
+    per bulan, serta nilai per wilayah yang diurutkan oleh RankIndex. Diagram
+    alur, tabel peringkat, dan ringkasan bulanan dibaca dari penghitung itu
+    tanpa memindai proyek.
+
+    Seperti data.RollupCube, hanya file Parquet baru yang dibaca saat sync().
+    """
+
+    def __init__(self):
+        self._projects = {}   # kunci proyek -> [tahap, investasi, bulan masuk tahap]
+        self._stages = {}     # (tahap, Kabupaten/Kota atau ALL) -> [proyek, investasi]
+        self._moves = {}      # (tahap tujuan, Kabupaten/Kota atau ALL) -> banyak perpindahan masuk
+        self._months = {}     # (bulan, Kabupaten/Kota atau ALL) -> [proyek baru, investasi baru]
+        self._regions = {}    # (Provinsi, Kabupaten/Kota) -> [nilai indikator, realisasi]
+        self._rankings = {}   # Provinsi -> RankIndex nilai indikator
+        self._realised = []   # heap (bulan realisasi, kunci proyek)
+        self._files = set()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self.latest = None
+        self.rows = 0
+        self.sample = False
+
+    def __getstate__(self):
+        # Kunci tidak dapat di-pickle; dibuat baru saat dimuat dari cache bersama
+        state = self.__dict__.copy()
+        del state['_lock'], state['_sync_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _count(self, stage, kabupaten, projects, investasi):
+        for region in (kabupaten, data.ALL):
+            _bump(self._stages, (stage, region), projects, investasi)
+
+    def _move(self, project, stage, kabupaten, month, regions, key):
+        old_stage, investasi = project[0], project[1]
+        self._count(old_stage, kabupaten, -1, -investasi)
+        self._count(stage, kabupaten, 1, investasi)
+        for region in (kabupaten, data.ALL):
+            _bump(self._moves, (stage, region), 1)
+        realised = (stage in REALISED_STAGES) - (old_stage in REALISED_STAGES)
+        _bump(regions, key[:2], 0.0, realised * investasi)
+        project[0], project[2] = stage, month
+        if stage == REALISASI and month is not None:
+            heapq.heappush(self._realised, (month, key))
+
+    def _apply(self, key, stage, investasi, month, regions):
+        kabupaten = key[1]
+        project = self._projects.get(key)
+        if project is None:
+            self._projects[key] = [stage, investasi, month]
+            self._count(stage, kabupaten, 1, investasi)
+            if month is not None:
+                for region in (kabupaten, data.ALL):
+                    _bump(self._months, (month, region), 1, investasi)
+            if stage == REALISASI and month is not None:
+                heapq.heappush(self._realised, (month, key))
+            _bump(regions, key[:2], investasi, investasi if stage in REALISED_STAGES else 0.0)
+            return
+
+        # Baris baru untuk proyek yang sudah ada: nilai investasinya diperbarui,
+        # lalu proyek berpindah tahap bila statusnya berubah
+        if project[0] == MONITORING and stage == REALISASI:
+            stage = MONITORING
+        change = investasi - project[1]
+        self._count(project[0], kabupaten, 0, change)
+        _bump(regions, key[:2], change, change if project[0] in REALISED_STAGES else 0.0)
+        project[1] = investasi
+        if stage != project[0]:
+            self._move(project, stage, kabupaten, month, regions, key)
+
+    def _advance(self, regions):
+        # Proyek yang sudah MONITORING_MONTHS bulan di tahap Realisasi pindah ke
+        # Monitoring; entri heap yang sudah usang (proyek telah pindah) dilewati
+        if self.latest is None:
+            return
+        cutoff = self.latest - MONITORING_MONTHS
+        while self._realised and self._realised[0][0] <= cutoff:
+            month, key = heapq.heappop(self._realised)
+            project = self._projects[key]
+            if project[0] == REALISASI and project[2] == month:
+                self._move(project, MONITORING, key[1], month, regions, key)
+
+    def add(self, table):
+        """Terapkan satu batch baris proyek (pyarrow.Table berkolom _COLUMNS, kecuali
+        Nama Proyek/Tahun/Bulan yang boleh tidak ada)."""
+        if table.num_rows == 0:
+            return
+        columns = {
+            name: table.column(name).to_pylist() if name in table.column_names else [None] * table.num_rows
+            for name in _COLUMNS
+        }
+        regions = {}
+        with self._lock:
+            for i, (provinsi, kabupaten, nama, status, investasi, tahun, bulan) in enumerate(
+                    zip(*(columns[name] for name in _COLUMNS))):
+                stage = STATUS_STAGES.get(status)
+                if stage is None or kabupaten is None:
+                    continue
+                # Tanpa nama proyek (data contoh) setiap baris adalah proyek sendiri
+                key = (provinsi, kabupaten, nama if nama is not None else f"#{self.rows + i}")
+                month = _month(tahun, bulan)
+                if month is not None and (self.latest is None or month > self.latest):
+                    self.latest = month
+                self._apply(key, stage, investasi or 0.0, month, regions)
+            self._advance(regions)
+            for (provinsi, kabupaten), (indikator, realisasi) in regions.items():
+                totals = self._regions.setdefault((provinsi, kabupaten), [0.0, 0.0])
+                totals[0] += indikator
+                totals[1] += realisasi
+                self._rankings.setdefault(provinsi, RankIndex()).update(kabupaten, totals[0])
+            self.rows += table.num_rows
+
+    def sync(self, dataset):
+        """Terapkan file Parquet yang belum pernah dibaca."""
+        if dataset is None:
+            return
+        with self._sync_lock:
+            new_files = [f for f in dataset.files if f not in self._files]
+            if new_files:
+                # File dari ingest berikutnya dibaca pada sync() berikutnya, sehingga
+                # status yang lebih baru menimpa yang lebih lama
+                for batch in data.files_dataset(new_files).to_batches(columns=_COLUMNS):
+                    self.add(pa.Table.from_batches([batch]))
+                self._files.update(new_files)
+
+    def _regions_of(self, kabupaten):
+        return [data.ALL] if kabupaten is None else list(kabupaten)
+
+    def stage_table(self, kabupaten=None):
+        """Banyak proyek, investasi, dan perpindahan masuk per tahap (kolom Tahap,
+        Dari, Proyek, Investasi, Masuk), untuk semua wilayah atau `kabupaten`."""
+        rows = []
+        with self._lock:
+            for stage in STAGES:
+                projects, investasi, moved = 0, 0.0, 0
+                for region in self._regions_of(kabupaten):
+                    counts = self._stages.get((stage, region), (0, 0.0))
+                    projects += counts[0]
+                    investasi += counts[1]
+                    moved += self._moves.get((stage, region), (0,))[0]
+                rows.append({'Tahap': stage, 'Dari': FLOW[stage], 'Proyek': projects,
+                             'Investasi': investasi, 'Masuk': moved})
+        return pd.DataFrame(rows)
+
+    def ranking(self, provinsi=RANKING_PROVINCE, kabupaten=None, limit=RANKING_SIZE):
+        """Tabel peringkat Kabupaten/Kota menurut nilai indikator (jumlah investasi
+        semua tahap), dengan kolom yang sama seperti data.load_project_table()."""
+        with self._lock:
+            index = self._rankings.get(provinsi, RankIndex())
+            top = index.top(limit, None if kabupaten is None else set(kabupaten))
+            rows = [
+                {
+                    'Kabupaten/Kota': name,
+                    'Nilai Indikator': value,
+                    'Ranking': rank,
+                    'Realisasi (T)': self._regions[(provinsi, name)][1],
+                }
+                for rank, name, value in top
+            ]
+        return data.compact(pd.DataFrame(rows, columns=['Kabupaten/Kota', 'Nilai Indikator', 'Ranking', 'Realisasi (T)']))
+
+    def monthly(self, kabupaten=None):
+        """Proyek dan investasi baru pada bulan terbaru dan bulan sebelumnya, atau
+        None bila data tidak memuat bulan."""
+        with self._lock:
+            if self.latest is None:
+                return None
+            result = {'bulan': _month_label(self.latest)}
+            for name, month in (('sekarang', self.latest), ('sebelumnya', self.latest - 1)):
+                projects, investasi = 0, 0.0
+                for region in self._regions_of(kabupaten):
+                    counts = self._months.get((month, region), (0, 0.0))
+                    projects += counts[0]
+                    investasi += counts[1]
+                result[name] = {'proyek': projects, 'investasi': investasi}
+        return result
+
+
+def _sample_table():
+    sample = data.load_jateng_data().assign(Provinsi='Jawa Tengah')
+    return pa.Table.from_pandas(sample[['Provinsi', 'Kabupaten/Kota', 'Status', 'Investasi']], preserve_index=False)
+
+
+def _build():
+    lifecycle = ProjectLifecycle()
+    dataset = data.project_dataset()
+    if dataset is None:
+        lifecycle.add(_sample_table())
+        lifecycle.sample = True
+    else:
+        lifecycle.sync(dataset)
+    return lifecycle
+
+
+@st.cache_resource(show_spinner=False)
+def _project_lifecycle():
+    return sharedcache.get_or_compute('siklus', 'proyek', data.data_version(), _build)
+
+
+def project_lifecycle():
+    """Siklus proyek bersama untuk semua sesi, disinkronkan dengan penyimpanan Parquet."""
+    lifecycle = _project_lifecycle()
+    dataset = data.project_dataset()
+    if lifecycle.sample and dataset is not None:
+        _project_lifecycle.clear()
+        lifecycle = _project_lifecycle()
+    lifecycle.sync(dataset)
+    return lifecycle
+
+
+def project_table(table, kabupaten=None):
+    """Tabel "Daftar Indikasi Proyek Investasi" dari peringkat wilayah.
+
+    `table` (data.load_project_table) dipakai apa adanya selama belum ada data proyek.
+    """
+    lifecycle = project_lifecycle()
+    if lifecycle.sample:
+        if kabupaten is not None:
+            table = table[table['Kabupaten/Kota'].isin(kabupaten)]
+        return table
+    return lifecycle.ranking(kabupaten=kabupaten)
+
+
+def summary_cards(kabupaten=None):
+    """Kartu "Ringkasan Bulan Ini": proyek dan investasi baru bulan terbaru beserta
+    selisihnya dengan bulan sebelumnya."""
+    monthly = project_lifecycle().monthly(kabupaten)
+    if monthly is None:
+        return SAMPLE_SUMMARY
+    now, before = monthly['sekarang'], monthly['sebelumnya']
+    return [
+        {"label": f"Proyek Baru {monthly['bulan']}", "value": f"{now['proyek']:,}",
+         "delta": f"{now['proyek'] - before['proyek']:+,}"},
+        {"label": f"Investasi Baru {monthly['bulan']}", "value": f"{now['investasi']:.1f}T",
+         "delta": f"{now['investasi'] - before['investasi']:+.1f}T"},
+    ]
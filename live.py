@@ -0,0 +1,116 @@
+import glob
+import os
+import threading
+import time
+from datetime import datetime
+
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import streamlit as st
+
+import anomaly
+import data
+import geo
+import lifecycle
+import publish
+
+# Folder tempat ekspor CSV baru diletakkan; file yang muncul di sini dimasukkan
+# otomatis ke penyimpanan Parquet
+DROP_DIR = os.environ.get(
+    "DASHBOARD_DROP_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "masuk")
+)
+POLL_SECONDS = 5
+
+MAP_COLUMNS = ['Provinsi', 'Kabupaten/Kota', 'Status', 'Investasi', 'Lat', 'Lon']
+
+
+def _map_rows(csv_path):
+    """Baris Jawa Tengah dari satu file CSV baru, hanya kolom yang dipakai peta."""
+    table = pacsv.read_csv(
+        csv_path,
+        convert_options=pacsv.ConvertOptions(
+            column_types=data.PROJECT_SCHEMA,
+            include_columns=MAP_COLUMNS,
+            include_missing_columns=True
+        )
+    )
+    table = table.filter(pc.equal(table['Provinsi'], 'Jawa Tengah'))
+    return table.drop_columns(['Provinsi']).to_pandas()
+
+
+class LiveIngestor:
+    """Pemantau folder DROP_DIR yang menerapkan data baru sebagai delta.
+
+    Berjalan di satu thread latar per proses. Setiap file CSV baru dimasukkan ke
+    penyimpanan Parquet, lalu hanya agregat yang terpengaruh yang diperbarui:
+    kubus KPI/tren, profil anomali wilayah, dan siklus proyek menyinkronkan file
+    Parquet barunya saja dan indeks peta menambah titik baru. Setelah itu snapshot data bersama dan
+    halaman statis (publish.py) diterbitkan ulang.
+    `version` naik setiap kali ada data baru, dipakai sesi untuk memutuskan
+    apakah perlu menggambar ulang.
+    """
+
+    def __init__(self, drop_dir=DROP_DIR, interval=POLL_SECONDS):
+        self.drop_dir = drop_dir
+        self.interval = interval
+        self.version = 0
+        self.last_update = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="live-ingest", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as error:
+                self.last_error = error
+            time.sleep(self.interval)
+
+    def poll(self):
+        """Masukkan file CSV baru di DROP_DIR; True bila ada data baru."""
+        with self._lock:
+            paths = sorted(glob.glob(os.path.join(self.drop_dir, "*.csv")))
+            done = data.ingested_files(data.STORE_DIR)
+            paths = [p for p in paths if os.path.basename(p) not in done]
+            if not paths:
+                return False
+
+            # Indeks peta diambil sebelum ingest agar titik baru tidak terhitung dua kali
+            was_sample = data.project_dataset() is None
+            index = None if was_sample else geo.map_index()
+            applied = [p for p in paths if data.ingest_csv(p)]
+            if not applied:
+                return False
+
+            # Handle dataset baru memuat file Parquet yang baru ditulis; kubus
+            # hanya membaca file yang belum pernah disinkronkan
+            data.project_dataset.clear()
+            data.load_jateng_data.clear()
+            data.load_trend_data.clear()
+            data.investment_cube()
+            anomaly.region_profile()
+            lifecycle.project_lifecycle()
+
+            if was_sample:
+                # Peta sebelumnya berisi data contoh: bangun ulang dari data asli
+                geo.map_index.clear()
+            else:
+                for path in applied:
+                    index.extend(_map_rows(path))
+
+            data.publish_snapshot()
+            self.version += 1
+            self.last_update = datetime.now()
+            # Halaman statis untuk pengunjung anonim mengikuti versi data baru
+            publish.publish()
+            return True
+
+
+@st.cache_resource(show_spinner=False)
+def live_ingestor():
+    os.makedirs(DROP_DIR, exist_ok=True)
+    return LiveIngestor()
@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+# Banyak sumber yang dimuat bersamaan
+LOADER_WORKERS = 8
+# Batas waktu bawaan satu sumber (detik), dihitung sejak pemuatan dimulai: selama
+# itu pembaca menunggu hasilnya, setelahnya pembaca mendapat Pending dan
+# pemuatan tetap berjalan di latar
+DEFAULT_TIMEOUT = 2.0
+
+
+class Pending(Exception):
+    """Sumber belum selesai dimuat dalam batas waktunya; hasilnya menyusul."""
+
+
+class Source:
+    """Satu sumber data: fungsi pemuat tanpa argumen dan sumber yang harus selesai lebih dulu."""
+
+    def __init__(self, name, load, deps=(), timeout=DEFAULT_TIMEOUT):
+        self.name = name
+        self.load = load
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"Source({self.name!r}, deps={self.deps!r})"
+
+
+def _check(sources):
+    names = {source.name for source in sources}
+    for source in sources:
+        missing = set(source.deps) - names
+        if missing:
+            raise ValueError(f"{source.name}: dependensi tidak dikenal {sorted(missing)}")
+    # Tiap sumber harus dapat diurutkan setelah dependensinya (tanpa siklus)
+    done, remaining = set(), list(sources)
+    while remaining:
+        ready = [s for s in remaining if set(s.deps) <= done]
+        if not ready:
+            raise ValueError(f"siklus dependensi: {sorted(s.name for s in remaining)}")
+        done.update(s.name for s in ready)
+        remaining = [s for s in remaining if s.name not in done]
+
+
+class LoadBatch:
+    """Satu putaran pemuatan semua sumber.
+
+    Sumber tanpa dependensi langsung dijalankan di thread pool; sumber lain
+    dijalankan begitu semua dependensinya selesai. Bila dependensi gagal,
+    sumber yang bergantung padanya ikut gagal dengan galat yang sama. Setiap
+    sumber punya Future sendiri sehingga pembaca bisa memakai hasil yang sudah
+    ada tanpa menunggu sumber yang lambat.
+    """
+
+    def __init__(self, sources, executor):
+        self.started = time.monotonic()
+        self._sources = {source.name: source for source in sources}
+        self._futures = {name: Future() for name in self._sources}
+        self._executor = executor
+        # Reentran: set_exception() di dalam _advance() memanggil _advance() lagi
+        self._lock = threading.RLock()
+        self._submitted = set()
+        self.durations = {}
+        for name in self._sources:
+            self._futures[name].add_done_callback(lambda _, name=name: self._advance())
+        self._advance()
+
+    def _advance(self):
+        # Jalankan sumber yang semua dependensinya sudah selesai
+        with self._lock:
+            for name, source in self._sources.items():
+                if name in self._submitted:
+                    continue
+                deps = [self._futures[dep] for dep in source.deps]
+                if not all(dep.done() for dep in deps):
+                    continue
+                self._submitted.add(name)
+                failed = next((dep.exception() for dep in deps if dep.exception() is not None), None)
+                if failed is not None:
+                    self._futures[name].set_exception(failed)
+                else:
+                    self._executor.submit(self._run, source)
+
+    def _run(self, source):
+        start = time.monotonic()
+        try:
+            result = source.load()
+        except BaseException as error:
+            self.durations[source.name] = time.monotonic() - start
+            self._futures[source.name].set_exception(error)
+        else:
+            self.durations[source.name] = time.monotonic() - start
+            self._futures[source.name].set_result(result)
+
+    def deadline(self, name):
+        return self.started + self._sources[name].timeout
+
+    def ready(self, name):
+        return self._futures[name].done()
+
+    def exception(self, name):
+        """Galat pemuat `name` yang sudah selesai, atau None."""
+        return self._futures[name].exception(0)
+
+    def get(self, name, timeout=None):
+        """Hasil sumber `name`.
+
+        Menunggu paling lama sampai batas waktu sumber (atau `timeout` detik bila
+        diberikan); bila belum selesai, Pending dilempar. Galat pemuat diteruskan.
+        """
+        if timeout is None:
+            timeout = max(0.0, self.deadline(name) - time.monotonic())
+        try:
+            return self._futures[name].result(timeout)
+        except FutureTimeout:
+            raise Pending(name) from None
+
+    def wait(self, names=None):
+        """Tunggu sumber `names` (bawaan: semua) sampai selesai tanpa batas waktu."""
+        for name in self._futures if names is None else names:
+            self._futures[name].result()
+
+
+class Orchestrator:
+    """Pemuat sumber data bersamaan dengan dependensi dan batas waktu per sumber."""
+
+    def __init__(self, sources, workers=LOADER_WORKERS):
+        sources = list(sources)
+        _check(sources)
+        self.sources = sources
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loader")
+
+    def start(self):
+        """Mulai satu putaran pemuatan dan kembalikan LoadBatch-nya tanpa menunggu."""
+        return LoadBatch(self.sources, self._executor)
@@ -0,0 +1,207 @@
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Pengukuran waktu per bagian dashboard. Nonaktif secara bawaan sehingga tidak
+# menambah biaya; aktif untuk seluruh proses lewat DASHBOARD_METRICS=1 (mis. oleh
+# benchmark.py), atau per sesi selama "Mode Lanjutan" dicentang.
+ENABLED = os.environ.get("DASHBOARD_METRICS") == "1"
+# Kunci widget checkbox "Mode Lanjutan" di app.py
+SESSION_FLAG = "mode_lanjutan"
+# Banyak kejadian terakhir yang disimpan untuk ekspor JSON lines
+EVENT_LOG_SIZE = 2000
+
+# Fase di dalam satu bagian: waktu total bagian, memuat data, membangun grafik
+TOTAL = "total"
+DATA = "data"
+FIGURE = "grafik"
+
+_local = threading.local()
+
+
+def active():
+    """True bila pengukuran aktif untuk rerun yang sedang berjalan."""
+    if ENABLED:
+        return True
+    # Di luar thread script (pool ekspor, ingest latar) tidak ada sesi yang meminta
+    if get_script_run_ctx() is None:
+        return False
+    return bool(st.session_state.get(SESSION_FLAG, False))
+
+
+def _stack():
+    stack = getattr(_local, "sections", None)
+    if stack is None:
+        stack = _local.sections = []
+    return stack
+
+
+def current_section():
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+class Recorder:
+    """Akumulator waktu per (bagian, fase), ukuran figure, dan log kejadian terakhir."""
+
+    def __init__(self, log_size=EVENT_LOG_SIZE):
+        self._lock = threading.Lock()
+        self._sections = {}
+        self._figures = {}
+        self._events = collections.deque(maxlen=log_size)
+
+    def record(self, name, seconds, phase=TOTAL):
+        with self._lock:
+            stats = self._sections.setdefault(
+                (name, phase), {'count': 0, 'total': 0.0, 'last': 0.0, 'max': 0.0}
+            )
+            stats['count'] += 1
+            stats['total'] += seconds
+            stats['last'] = seconds
+            stats['max'] = max(stats['max'], seconds)
+            self._events.append({'ts': time.time(), 'section': name, 'phase': phase, 'seconds': seconds})
+
+    def record_figure(self, name, size):
+        """Ukuran figure ter-serialisasi (byte) yang dikirim ke browser."""
+        with self._lock:
+            self._figures[name] = size
+            self._events.append({'ts': time.time(), 'section': current_section(), 'figure': name, 'bytes': size})
+
+    def sections(self, phase=TOTAL):
+        """Salinan statistik satu fase semua bagian, {nama: {count, total, last, max}}."""
+        with self._lock:
+            return {name: dict(stats) for (name, p), stats in self._sections.items() if p == phase}
+
+    def phases(self):
+        """Salinan statistik semua (bagian, fase)."""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._sections.items()}
+
+    def figures(self):
+        with self._lock:
+            return dict(self._figures)
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def reset(self):
+        with self._lock:
+            self._sections.clear()
+            self._figures.clear()
+            self._events.clear()
+
+
+recorder = Recorder()
+
+# Sumber statistik cache: nama -> fungsi yang mengembalikan {entri: {hits, misses}}
+_CACHES = {}
+
+
+def register_cache(name, stats):
+    """Daftarkan cache agar hit/miss-nya tampil di panel dan ekspor."""
+    _CACHES[name] = stats
+
+
+def cache_stats():
+    """{(cache, entri): {hits, misses, hit_rate}} dari semua cache terdaftar."""
+    result = {}
+    for name, stats in _CACHES.items():
+        for entry, counts in stats().items():
+            lookups = counts['hits'] + counts['misses']
+            result[(name, entry)] = {
+                'hits': counts['hits'],
+                'misses': counts['misses'],
+                'hit_rate': counts['hits'] / lookups if lookups else None,
+            }
+    return result
+
+
+@contextlib.contextmanager
+def section(name):
+    """Ukur waktu blok kode sebagai satu bagian dashboard."""
+    if not active():
+        yield
+        return
+    stack = _stack()
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record(name, time.perf_counter() - start)
+        stack.pop()
+
+
+@contextlib.contextmanager
+def phase(kind):
+    """Ukur sebagian pekerjaan (DATA/FIGURE) di dalam bagian yang sedang berjalan."""
+    name = current_section()
+    if name is None or not active():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record(name, time.perf_counter() - start, kind)
+
+
+def timed(name):
+    """Dekorator: ukur setiap pemanggilan fungsi sebagai bagian `name`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============= EKSPOR =============
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def prometheus_text():
+    """Semua metrik dalam format teks eksposisi Prometheus."""
+    lines = []
+
+    def family(metric, kind, help_text, samples):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for labels, value in samples:
+            lines.append(f"{metric}{{{labels}}} {value}")
+
+    phases = sorted(recorder.phases().items())
+    family("dashboard_section_seconds_total", "counter", "Waktu kumulatif per bagian dan fase.",
+           [(_labels(section=name, phase=p), f"{s['total']:.6f}") for (name, p), s in phases])
+    family("dashboard_section_runs_total", "counter", "Banyak eksekusi per bagian dan fase.",
+           [(_labels(section=name, phase=p), s['count']) for (name, p), s in phases])
+    family("dashboard_section_seconds_max", "gauge", "Waktu terlama satu eksekusi.",
+           [(_labels(section=name, phase=p), f"{s['max']:.6f}") for (name, p), s in phases])
+    family("dashboard_figure_bytes", "gauge", "Ukuran figure ter-serialisasi terakhir.",
+           [(_labels(figure=name), size) for name, size in sorted(recorder.figures().items())])
+    caches = sorted(cache_stats().items())
+    family("dashboard_cache_hits_total", "counter", "Hit cache per entri.",
+           [(_labels(cache=name, entry=entry), s['hits']) for (name, entry), s in caches])
+    family("dashboard_cache_misses_total", "counter", "Miss cache per entri.",
+           [(_labels(cache=name, entry=entry), s['misses']) for (name, entry), s in caches])
+    return "\n".join(lines) + "\n"
+
+
+def json_lines():
+    """Log kejadian terakhir, satu objek JSON per baris."""
+    return "".join(json.dumps(event, ensure_ascii=False) + "\n" for event in recorder.events())
@@ -0,0 +1,213 @@
+"""Penerbit halaman statis tampilan bawaan dashboard.
+
+Tampilan bawaan keempat tab (filter sidebar bawaan, zoom peta bawaan) dirender
+di luar sesi Streamlit menjadi satu file HTML mandiri berdasarkan
+template/index.html: kartu KPI, indikator utama, dan figure Plotly sebagai JSON
+tertanam beserta plotly.js. Pengunjung anonim yang hanya membaca dapat dilayani
+dari file statis ini; hanya pengguna interaktif yang memerlukan worker Streamlit.
+
+Halaman hanya dibuat ulang bila versi data (data.data_version()) berubah.
+LiveIngestor memanggil publish() setiap ada data baru.
+
+Penggunaan:
+    python publish.py                   # terbitkan ke DASHBOARD_SITE_DIR bila data berubah
+    python publish.py --force --output publik/
+"""
+import argparse
+import html
+import json
+import os
+import string
+import sys
+from datetime import datetime
+
+import anomaly
+import charts
+import data
+import forecast
+import geo
+import lifecycle
+import query
+import tiles
+
+SITE_DIR = os.environ.get(
+    "DASHBOARD_SITE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "publik")
+)
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template", "index.html")
+PAGE_NAME = "index.html"
+TITLE = "Dashboard Investasi"
+
+# Tampilan bawaan, sama dengan nilai awal sidebar dan peta di app.py
+DEFAULT_PERIODE = "Tahunan"
+DEFAULT_WILAYAH = ["Semarang", "Kendal", "Batang"]
+DEFAULT_ZOOM = 8
+INSIGHT_ANOMALIES = 3
+ACTIVE = ' class="aktif"'
+
+
+def _figure_div(name):
+    return f'<div class="figure" data-figure="{name}"></div>'
+
+
+def _title(text):
+    return f'<div class="section-title">{html.escape(text)}</div>'
+
+
+def _stat_cards(stats):
+    cards = []
+    for label, stat in stats.items():
+        value = f"{stat['value']:.2f}" if stat['value'] < 100 else f"{stat['value']:.1f}"
+        direction = "naik" if stat['change'] > 0 else "turun"
+        cards.append(
+            f'<div class="metric-card"><div class="metric-title">{html.escape(label)}</div>'
+            f'<div class="metric-value">{value}</div>'
+            f'<div class="metric-delta {direction}">{stat["change"]:+.2f}%</div>'
+            f'<div class="metric-target">Target: {html.escape(str(stat["target"]))}</div></div>'
+        )
+    return "".join(cards)
+
+
+def _kpi_cards(cards):
+    return "".join(
+        f'<div class="kpi-card"><div class="kpi-label">{html.escape(card["label"])}</div>'
+        f'<div class="kpi-value">{html.escape(card["value"])}</div>'
+        + (f'<div class="kpi-suffix">{html.escape(card["suffix"])}</div>' if card['suffix'] else '')
+        + '</div>'
+        for card in cards
+    )
+
+
+def render_default_view():
+    """Figure dan potongan HTML tampilan bawaan: ({nama: figure}, [(tab, html)])."""
+    # Di luar sesi tidak ada placeholder: tunggu semua dataset selesai dimuat
+    snapshot = data.snapshot().join()
+    selection = query.select(query.DashboardFilter(DEFAULT_WILAYAH, None))
+    periode = DEFAULT_PERIODE
+
+    # Pemanggilan yang sama dengan app.py agar hasilnya identik (dan berbagi cache grafik)
+    index = geo.map_index()
+    bounds = geo.viewport(geo.MAP_CENTER, DEFAULT_ZOOM)
+    markers = index.clusters(DEFAULT_ZOOM, mask=selection.mask, bounds=bounds)
+    boundaries = tiles.boundary_level(DEFAULT_ZOOM, bounds)
+    region_totals = index.region_totals(selection.mask) if boundaries is not None else None
+    anomalies = anomaly.region_anomalies(selection.kabupaten)
+    trend_data = data.cube_trend(periode, selection.kabupaten)
+    projection = forecast.trend_forecast(periode, trend_data.columns.drop('Periode'), selection.kabupaten)
+    project_table = lifecycle.project_table(snapshot.project_table, selection.kabupaten)
+    stages = lifecycle.project_lifecycle().stage_table(selection.kabupaten)
+
+    figures = {
+        'peta': charts.map_figure(markers, DEFAULT_ZOOM, geo.MAP_CENTER, boundaries, region_totals, anomalies),
+        'tren': charts.trend_figure(trend_data, projection),
+        'alur': charts.flow_figure(stages),
+        'fasilitas_kesehatan': charts.health_facilities_figure(snapshot.health_facilities),
+        'vaksinasi': charts.vaccination_figure(snapshot.vaccination_data),
+        'transportasi': charts.transport_figure(snapshot.transport_data),
+        'kondisi_jalan': charts.road_condition_figure(snapshot.road_condition),
+        'proyek_infrastruktur': charts.infra_projects_figure(snapshot.infra_projects),
+        'energi': charts.energy_figure(snapshot.energy_data),
+    }
+
+    findings = anomaly.findings(snapshot.stats_data, selection.kabupaten, INSIGHT_ANOMALIES)
+    investasi = (
+        '<div class="columns investasi">'
+        f'<div>{_title("📍 Peta Sebaran Investasi")}{_figure_div("peta")}'
+        f'{_title("📈 Tren Realisasi Investasi 2016-2024")}{_figure_div("tren")}</div>'
+        f'<div>{_title("🔄 Diagram Alur Investasi")}{_figure_div("alur")}'
+        f'{_title("📋 Daftar Indikasi Proyek Investasi")}{project_table.to_html(index=False, border=0)}'
+        + (f'<div class="insight-box"><h4>📈 Capaian Realisasi Investasi</h4><ul>{"".join(findings)}</ul></div>'
+           if findings else '')
+        + f'</div><div>{_title("💰 Nilai Investasi Masuk")}'
+        f'{_kpi_cards(data.kpi_cards(snapshot.kpi_data, periode, selection.kabupaten))}</div></div>'
+    )
+
+    def pair(left_title, left, right_title, right):
+        return (f'<div class="columns dua"><div><h3>{html.escape(left_title)}</h3>{_figure_div(left)}</div>'
+                f'<div><h3>{html.escape(right_title)}</h3>{_figure_div(right)}</div></div>')
+
+    tabs = [
+        ("📚 Investasi", investasi),
+        ("🏥 Kesehatan", pair("🏥 Fasilitas Kesehatan", "fasilitas_kesehatan", "💉 Cakupan Vaksinasi", "vaksinasi")),
+        ("🚌 Transportasi", pair("🚊 Transportasi Publik", "transportasi", "🛣️ Kondisi Jalan", "kondisi_jalan")),
+        ("🏗️ Infrastruktur", pair("🏗️ Proyek Infrastruktur", "proyek_infrastruktur", "⚡ Konsumsi Energi", "energi")),
+    ]
+    return figures, tabs
+
+
+def render_page(version):
+    """Dokumen HTML lengkap tampilan bawaan untuk versi data `version`."""
+    from plotly.offline import get_plotlyjs
+
+    figures, tabs = render_default_view()
+    snapshot = data.snapshot().join()
+    with open(TEMPLATE_PATH, encoding="utf-8") as f:
+        template = string.Template(f.read())
+
+    # JSON di dalam <script> tidak boleh memuat "</" agar tag tidak tertutup lebih awal
+    figures_json = "{" + ",".join(
+        f"{json.dumps(name)}:{fig.to_json()}" for name, fig in figures.items()
+    ).replace("</", "<\\/") + "}"
+    return template.substitute(
+        title=html.escape(TITLE),
+        version=html.escape(version),
+        generated=datetime.now().strftime('%d %B %Y %H:%M'),
+        stats=_stat_cards(snapshot.stats_data),
+        tab_buttons="".join(
+            f'<button data-tab="{i}"{ACTIVE if i == 0 else ""}>{html.escape(label)}</button>'
+            for i, (label, _) in enumerate(tabs)
+        ),
+        tabs="".join(
+            f'<section class="tab{" aktif" if i == 0 else ""}" data-tab="{i}">{body}</section>'
+            for i, (_, body) in enumerate(tabs)
+        ),
+        figures=figures_json,
+        plotlyjs=get_plotlyjs(),
+    )
+
+
+def published_version(site_dir=SITE_DIR):
+    """Versi data halaman yang terakhir diterbitkan, atau None."""
+    try:
+        with open(os.path.join(site_dir, "versi.txt"), encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def publish(site_dir=SITE_DIR, force=False):
+    """Terbitkan halaman statis bila versi data berubah; kembalikan path-nya atau None."""
+    version = data.data_version()
+    if not force and published_version(site_dir) == version:
+        return None
+    page = render_page(version)
+
+    # Ditulis ke nama sementara lalu dipindah: server statis tidak pernah
+    # menyajikan halaman setengah jadi
+    os.makedirs(site_dir, exist_ok=True)
+    path = os.path.join(site_dir, PAGE_NAME)
+    for name, content in ((PAGE_NAME, page), ("versi.txt", version + "\n")):
+        target = os.path.join(site_dir, name)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=SITE_DIR, help="folder tujuan halaman statis")
+    parser.add_argument("--force", action="store_true", help="terbitkan walau versi data tidak berubah")
+    args = parser.parse_args(argv)
+
+    path = publish(args.output, args.force)
+    if path is None:
+        print(f"Halaman di {args.output} sudah memakai versi data {data.data_version()}")
+    else:
+        print(f"Diterbitkan: {path} ({os.path.getsize(path) / 2 ** 20:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
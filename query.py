@@ -0,0 +1,117 @@
+import functools
+
+import numpy as np
+import pyarrow.dataset as ds
+
+import data
+import geo
+import metrics
+
+
+class DashboardFilter:
+    """Predikat filter tunggal dari pilihan sidebar dan kotak pencarian.
+
+    - wilayah: Kabupaten/Kota dari "Fokus Wilayah" (kosong = semua)
+    - threshold: ambang minimum Investasi (T) dari "Mode Lanjutan", atau None
+    - kabupaten: Kabupaten/Kota hasil pencarian, atau None bila tidak mencari
+
+    Predikat yang sama dapat dievaluasi sebagai mask boolean NumPy atau
+    diterjemahkan ke ekspresi pyarrow untuk didorong ke pemindaian Parquet.
+    """
+
+    def __init__(self, wilayah=None, threshold=None, kabupaten=None):
+        self.wilayah = tuple(sorted(wilayah)) if wilayah else ()
+        self.threshold = threshold
+        self.kabupaten = tuple(sorted(kabupaten)) if kabupaten is not None else None
+
+    def key(self):
+        return (self.wilayah, self.threshold, self.kabupaten)
+
+    def __eq__(self, other):
+        return isinstance(other, DashboardFilter) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"DashboardFilter(wilayah={self.wilayah!r}, threshold={self.threshold!r}, kabupaten={self.kabupaten!r})"
+
+    def regions(self):
+        """Kabupaten/Kota yang diizinkan, atau None bila tidak dibatasi wilayah."""
+        allowed = set(self.wilayah) if self.wilayah else None
+        if self.kabupaten is not None:
+            allowed = set(self.kabupaten) if allowed is None else allowed & set(self.kabupaten)
+        return allowed
+
+    def mask_arrays(self, names, investasi):
+        """Mask boolean untuk array Kabupaten/Kota dan Investasi yang sejajar."""
+        mask = np.ones(len(names), dtype=bool)
+        allowed = self.regions()
+        if allowed is not None:
+            mask &= np.isin(names, list(allowed))
+        if self.threshold is not None:
+            mask &= investasi >= self.threshold
+        return mask
+
+    def mask(self, df):
+        """Mask boolean untuk DataFrame; kolom yang tidak ada tidak difilter."""
+        mask = np.ones(len(df), dtype=bool)
+        allowed = self.regions()
+        if allowed is not None and 'Kabupaten/Kota' in df:
+            mask &= df['Kabupaten/Kota'].isin(allowed).to_numpy()
+        if self.threshold is not None and 'Investasi' in df:
+            mask &= (df['Investasi'] >= self.threshold).to_numpy()
+        return mask
+
+    def expression(self):
+        """Ekspresi pyarrow setara, atau None bila filter kosong."""
+        expr = None
+        allowed = self.regions()
+        if allowed is not None:
+            expr = ds.field('Kabupaten/Kota').isin(sorted(allowed))
+        if self.threshold is not None:
+            cond = ds.field('Investasi') >= self.threshold
+            expr = cond if expr is None else expr & cond
+        return expr
+
+
+class Selection:
+    """Hasil evaluasi filter atas data peta investasi, dipakai bersama semua widget."""
+
+    def __init__(self, flt, mask, kabupaten):
+        self.filter = flt
+        self.mask = mask
+        # Kabupaten/Kota yang masih punya baris setelah filter
+        self.kabupaten = kabupaten
+
+    @property
+    def unfiltered(self):
+        return self.mask is None
+
+
+@functools.lru_cache(maxsize=32)
+def _select(flt, version):
+    index = geo.map_index()
+    if flt.regions() is None and flt.threshold is None:
+        return Selection(flt, None, None)
+    names, investasi = index.columns()
+    mask = flt.mask_arrays(names, investasi)
+    mask.setflags(write=False)
+    return Selection(flt, mask, frozenset(names[mask]))
+
+
+def select(flt):
+    """Evaluasi filter sekali per kombinasi filter dan versi data."""
+    return _select(flt, data.data_version())
+
+
+def clear_cache():
+    _select.cache_clear()
+
+
+def _cache_stats():
+    info = _select.cache_info()
+    return {'select': {'hits': info.hits, 'misses': info.misses}}
+
+
+metrics.register_cache("filter", _cache_stats)
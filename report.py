@@ -0,0 +1,175 @@
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import plotly.io as pio
+import streamlit as st
+
+import charts
+import data
+import geo
+import lifecycle
+import query
+
+# Laporan yang sudah jadi disimpan dengan nama berdasarkan hash isi permintaan,
+# sehingga permintaan yang sama dari pengguna lain langsung dilayani dari disk
+REPORT_DIR = os.environ.get(
+    "DASHBOARD_REPORT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "laporan")
+)
+REPORT_WORKERS = 2
+
+# Konfigurasi Plotly untuk grafik statis (tanpa interaksi) di dalam laporan
+STATIC_CONFIG = {"staticPlot": True, "displayModeBar": False}
+
+
+def report_key(periode, wilayah, threshold, version):
+    """Kunci isi laporan: sama untuk periode/wilayah/ambang/versi data yang sama."""
+    payload = json.dumps(
+        {"periode": periode, "wilayah": sorted(wilayah or []), "threshold": threshold, "versi": version},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def report_path(key):
+    return os.path.join(REPORT_DIR, f"{key}.html")
+
+
+def _figure_html(fig, include_plotlyjs=False):
+    return pio.to_html(fig, full_html=False, include_plotlyjs=include_plotlyjs, config=STATIC_CONFIG)
+
+
+def _section(title, *parts):
+    return f"<section><h2>{html.escape(title)}</h2>{''.join(parts)}</section>"
+
+
+def build_report(periode, wilayah, threshold, path):
+    """Bangun laporan HTML lengkap keempat tab dan tulis ke `path`.
+
+    Dijalankan di proses pekerja; file ditulis ke nama sementara lalu dipindah,
+    sehingga pembaca tidak pernah melihat laporan setengah jadi.
+    """
+    flt = query.DashboardFilter(wilayah, threshold)
+    jateng = data.load_jateng_data()
+    mask = flt.mask(jateng)
+    markers = geo.GridIndex(jateng).clusters(8, mask=mask)
+    kabupaten = flt.regions()
+
+    kpi = data.cube_kpi(periode, kabupaten)
+    kpi_rows = "".join(
+        f"<tr><th>{html.escape(label)}</th><td>{html.escape(str(value))}</td></tr>"
+        for label, value in (kpi or {}).items()
+    )
+
+    body = [
+        _section(
+            "📚 Investasi",
+            _figure_html(charts.map_figure(markers, 8, geo.MAP_CENTER), include_plotlyjs=True),
+            _figure_html(charts.trend_figure(data.cube_trend(periode, kabupaten))),
+            _figure_html(charts.flow_figure(lifecycle.project_lifecycle().stage_table(kabupaten))),
+            lifecycle.project_table(data.load_project_table(), kabupaten).to_html(index=False),
+            f"<table>{kpi_rows}</table>" if kpi_rows else "",
+        ),
+        _section(
+            "🏥 Kesehatan",
+            _figure_html(charts.health_facilities_figure(data.load_health_facilities())),
+            _figure_html(charts.vaccination_figure(data.load_vaccination_data())),
+        ),
+        _section(
+            "🚌 Transportasi",
+            _figure_html(charts.transport_figure(data.load_transport_data())),
+            _figure_html(charts.road_condition_figure(data.load_road_condition())),
+        ),
+        _section(
+            "🏗️ Infrastruktur",
+            _figure_html(charts.infra_projects_figure(data.load_infra_projects())),
+            _figure_html(charts.energy_figure(data.load_energy_data())),
+        ),
+    ]
+    header = (
+        f"<h1>Laporan Dashboard Investasi</h1>"
+        f"<p>Periode: {html.escape(periode)} | Wilayah: {html.escape(', '.join(wilayah) if wilayah else 'Semua')}"
+        f" | Dibuat: {datetime.now().strftime('%d %B %Y %H:%M')}</p>"
+    )
+    document = (
+        "<!DOCTYPE html><html lang=\"id\"><head><meta charset=\"utf-8\">"
+        "<title>Laporan Dashboard Investasi</title></head><body>"
+        + header + "".join(body) + "</body></html>"
+    )
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(document)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ReportQueue:
+    """Antrean laporan bersama untuk semua sesi.
+
+    Pekerjaan dijalankan di ProcessPoolExecutor (di luar thread script Streamlit).
+    Permintaan yang identik selama masih diproses memakai future yang sama, dan
+    laporan yang sudah ada di REPORT_DIR tidak dibuat ulang.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS):
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._jobs = {}
+        self._errors = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        # Pekerjaan yang sudah selesai cukup diwakili file di disk atau galatnya
+        for key, future in list(self._jobs.items()):
+            if future.done():
+                del self._jobs[key]
+                error = future.exception() if not future.cancelled() else RuntimeError("dibatalkan")
+                if error is not None:
+                    self._errors[key] = error
+
+    def submit(self, periode, wilayah, threshold):
+        """Antrekan laporan dan kembalikan kuncinya."""
+        key = report_key(periode, wilayah, threshold, data.data_version())
+        with self._lock:
+            self._prune()
+            if key in self._jobs or os.path.exists(report_path(key)):
+                return key
+            self._errors.pop(key, None)
+            self._jobs[key] = self._executor.submit(
+                build_report, periode, list(wilayah or []), threshold, report_path(key)
+            )
+        return key
+
+    def status(self, key):
+        """Status laporan: 'selesai', 'antre', 'diproses', atau 'gagal'."""
+        if os.path.exists(report_path(key)):
+            return "selesai"
+        with self._lock:
+            self._prune()
+            future = self._jobs.get(key)
+        if future is None:
+            return "gagal"
+        return "diproses" if future.running() else "antre"
+
+    def error(self, key):
+        with self._lock:
+            return self._errors.get(key)
+
+    def pending(self):
+        with self._lock:
+            return len(self._jobs)
+
+
+@st.cache_resource(show_spinner=False)
+def report_queue():
+    return ReportQueue()
@@ -0,0 +1,137 @@
+import bisect
+import re
+
+import streamlit as st
+
+import data
+import sharedcache
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Huruf kecil, tanda baca menjadi spasi."""
+    return _NON_WORD.sub(" ", str(text).lower()).strip()
+
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """Indeks terbalik (inverted index) untuk pencarian di header dashboard.
+
+    Setiap dokumen adalah satu entitas (kabupaten/kota, proyek, sektor, provinsi,
+    indikator, KPI) beserta wilayah yang terkait dengannya. Kata kueri dicocokkan
+    dengan awalan token (pencarian biner pada daftar token terurut) dan dengan
+    potongan di tengah kata lewat indeks trigram, jadi tidak ada pemindaian
+    linear atas DataFrame per ketikan.
+    """
+
+    def __init__(self):
+        self.docs = []
+        self._postings = {}
+        self._trigrams = {}
+        self._tokens = []
+        # Himpunan wilayah yang sama dipakai bersama oleh banyak dokumen (proyek
+        # satu kabupaten); satu objek per himpunan menghemat memori dan pickle
+        self._regions = {}
+
+    def _region_set(self, names):
+        names = frozenset(names)
+        return self._regions.setdefault(names, names)
+
+    def add(self, kind, label, kabupaten=(), provinsi=()):
+        doc_id = len(self.docs)
+        self.docs.append({
+            'kind': kind,
+            'label': label,
+            'kabupaten': self._region_set(kabupaten),
+            'provinsi': self._region_set(provinsi),
+        })
+        for token in normalize(label).split():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings.add(doc_id)
+
+    def build(self):
+        """Siapkan daftar token terurut untuk pencarian awalan."""
+        self._tokens = sorted(self._postings)
+        return self
+
+    def _matching_tokens(self, word):
+        start = bisect.bisect_left(self._tokens, word)
+        end = bisect.bisect_left(self._tokens, word + "\uffff")
+        matched = set(self._tokens[start:end])
+        if len(word) >= 3:
+            grams = trigrams(word)
+            candidates = set.intersection(*(self._trigrams.get(g, set()) for g in grams))
+            matched.update(token for token in candidates if word in token)
+        return matched
+
+    def search(self, query):
+        """Id dokumen yang memuat semua kata kueri (sebagai awalan atau potongan)."""
+        result = None
+        for word in normalize(query).split():
+            docs = set()
+            for token in self._matching_tokens(word):
+                docs |= self._postings[token]
+            result = docs if result is None else result & docs
+            if not result:
+                return []
+        return sorted(result) if result else []
+
+    def match(self, query, limit=20):
+        """Hasil pencarian untuk ditampilkan dan dipakai sebagai filter grafik."""
+        doc_ids = self.search(query)
+        kabupaten, provinsi = set(), set()
+        for doc_id in doc_ids:
+            kabupaten |= self.docs[doc_id]['kabupaten']
+            provinsi |= self.docs[doc_id]['provinsi']
+        return {
+            'total': len(doc_ids),
+            'docs': [self.docs[doc_id] for doc_id in doc_ids[:limit]],
+            'kabupaten': kabupaten,
+            'provinsi': provinsi,
+        }
+
+
+def build_index():
+    """Bangun indeks dari semua dataset dashboard."""
+    index = SearchIndex()
+
+    jateng = data.load_jateng_data()
+    for kabupaten in jateng['Kabupaten/Kota'].dropna().unique():
+        index.add('Kabupaten/Kota', kabupaten, kabupaten=[kabupaten], provinsi=['Jawa Tengah'])
+
+    for provinsi in data.load_trend_data().columns.drop('Tahun'):
+        index.add('Provinsi', provinsi, provinsi=[provinsi])
+
+    projects = data.read_projects(columns=['Nama Proyek', 'Kabupaten/Kota', 'Provinsi', 'Sektor'])
+    if projects is not None:
+        projects = projects.to_pandas()
+        for name, kabupaten, provinsi in zip(projects['Nama Proyek'], projects['Kabupaten/Kota'], projects['Provinsi']):
+            if name:
+                index.add('Proyek', name, kabupaten=[kabupaten], provinsi=[provinsi])
+        sectors = projects.groupby('Sektor').agg({'Kabupaten/Kota': 'unique', 'Provinsi': 'unique'})
+        for sektor, row in sectors.iterrows():
+            index.add('Sektor', sektor, kabupaten=row['Kabupaten/Kota'], provinsi=row['Provinsi'])
+    else:
+        for sektor in data.load_infra_projects()['Sektor']:
+            index.add('Sektor', sektor)
+
+    for label in data.load_stats_data():
+        index.add('Indikator', label)
+    for kpi in data.load_kpi_data():
+        index.add('KPI', kpi['label'])
+
+    return index.build()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def search_index(version):
+    """Indeks bersama untuk semua sesi, dibangun ulang bila versi data berubah."""
+    return sharedcache.get_or_compute('indeks', 'pencarian', version, build_index)
@@ -0,0 +1,278 @@
+import gc
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+import metrics
+
+# Cache tingkat kedua yang dipakai bersama semua proses Streamlit di satu mesin
+# (mis. beberapa worker di belakang load balancer). Cache di memori tiap proses
+# (st.cache_*, FigureCache) tetap menjadi tingkat pertama; entri yang belum ada di
+# sana diambil dari sini sebelum dihitung ulang. Nilai "off" menonaktifkannya.
+CACHE_PATH = os.environ.get(
+    "DASHBOARD_SHARED_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "cache.sqlite3")
+)
+# Batas ukuran total entri; entri yang paling lama tidak dibaca dibuang lebih dulu
+MAX_BYTES = int(float(os.environ.get("DASHBOARD_SHARED_CACHE_MB", 512)) * 2 ** 20)
+# Worker lain yang sedang menghitung entri yang sama dianggap gagal setelah selang ini
+LOCK_TIMEOUT = 300
+LOCK_POLL = 0.05
+# Naikkan bila format nilai yang disimpan berubah, agar entri lama tidak dibaca
+SCHEMA_VERSION = 1
+
+_MISSING = object()
+
+
+class SQLiteBackend:
+    """Penyimpanan entri di satu file SQLite (WAL) yang dibuka semua proses.
+
+    Setiap entri dikunci dengan (kunci, versi); menyimpan versi baru suatu kunci
+    menghapus versi lamanya. Tabel `locks` dipakai untuk single-flight lintas
+    proses.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connection() as con:
+            con.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    version TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    expires REAL
+                );
+                CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+                CREATE TABLE IF NOT EXISTS locks (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires REAL NOT NULL
+                );
+            """)
+
+    def _connection(self):
+        # Satu koneksi per thread; sqlite3 tidak boleh dipakai lintas thread tanpa kunci
+        con = getattr(self._local, "con", None)
+        if con is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            con = self._local.con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+        return con
+
+    def get(self, key, version):
+        con = self._connection()
+        row = con.execute(
+            "SELECT value FROM entries WHERE key = ? AND version = ? AND (expires IS NULL OR expires > ?)",
+            (key, version, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        con.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, key, version, value, ttl=None):
+        con = self._connection()
+        now = time.time()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute(
+                "INSERT OR REPLACE INTO entries (key, version, value, size, accessed, expires) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, version, value, len(value), now, None if ttl is None else now + ttl)
+            )
+            # LRU: buang entri tertua sampai total ukuran kembali di bawah batas
+            con.execute(
+                "DELETE FROM entries WHERE key IN ("
+                " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS running"
+                " FROM entries) WHERE running > ?)",
+                (self.max_bytes,)
+            )
+            con.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+
+    def lock(self, key, owner, timeout=LOCK_TIMEOUT):
+        """True bila `owner` mendapat hak menghitung `key`."""
+        con = self._connection()
+        now = time.time()
+        with con:
+            con.execute("BEGIN IMMEDIATE")
+            con.execute("DELETE FROM locks WHERE key = ? AND expires <= ?", (key, now))
+            cursor = con.execute(
+                "INSERT OR IGNORE INTO locks (key, owner, expires) VALUES (?, ?, ?)",
+                (key, owner, now + timeout)
+            )
+            return cursor.rowcount == 1
+
+    def locked(self, key):
+        row = self._connection().execute(
+            "SELECT 1 FROM locks WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def unlock(self, key, owner):
+        self._connection().execute("DELETE FROM locks WHERE key = ? AND owner = ?", (key, owner))
+
+    def clear(self, prefix=""):
+        self._connection().execute("DELETE FROM entries WHERE key LIKE ? ESCAPE '\\'", (
+            prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+        ))
+
+    def usage(self):
+        count, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {'entries': count, 'bytes': size, 'max_bytes': self.max_bytes}
+
+
+class SharedCache:
+    """Cache tingkat kedua dengan kunci berversi dan single-flight.
+
+    get_or_compute() membaca entri dari backend; bila tidak ada, hanya satu
+    pemanggil di antara semua thread dan proses yang menghitungnya, sedangkan
+    yang lain menunggu hasilnya muncul di backend. Backend dapat diganti dengan
+    implementasi lain yang memiliki get/put/lock/locked/unlock/clear/usage
+    (mis. klien Redis lokal).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.owner = f"{os.getpid()}:{id(self)}"
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            stats = self.stats.setdefault(namespace, {'hits': 0, 'misses': 0})
+            stats[outcome] += 1
+
+    def _get(self, key, version, loads):
+        try:
+            blob = self.backend.get(key, version)
+        except sqlite3.Error:
+            return _MISSING
+        if blob is None:
+            return _MISSING
+        # Membongkar ratusan ribu objek kecil memicu GC berulang kali tanpa ada
+        # yang bisa dibebaskan; GC dijeda selama loads
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return loads(blob)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def _put(self, key, version, value, dumps, ttl):
+        try:
+            self.backend.put(key, version, dumps(value), ttl)
+        except sqlite3.Error:
+            # Cache tingkat kedua hanya percepatan: kegagalan menulis tidak menggagalkan halaman
+            pass
+
+    def get_or_compute(self, namespace, name, version, compute, ttl=None,
+                       dumps=pickle.dumps, loads=pickle.loads):
+        """Nilai (namespace, name) untuk `version`, dihitung dengan `compute` bila belum ada."""
+        key = f"{namespace}:{name}"
+        version = f"{SCHEMA_VERSION}:{version}"
+        value = self._get(key, version, loads)
+        if value is not _MISSING:
+            self._count(namespace, 'hits')
+            return value
+
+        # Thread lain di proses ini yang meminta kunci yang sama menunggu di sini
+        with self._lock:
+            flight = self._flights.setdefault(key, threading.Lock())
+        with flight:
+            value = self._get(key, version, loads)
+            if value is not _MISSING:
+                self._count(namespace, 'hits')
+                return value
+            self._count(namespace, 'misses')
+            deadline = time.monotonic() + LOCK_TIMEOUT
+            while not self._try_lock(key):
+                # Proses lain sedang menghitung: tunggu hasilnya atau kuncinya kedaluwarsa
+                time.sleep(LOCK_POLL)
+                value = self._get(key, version, loads)
+                if value is not _MISSING:
+                    return value
+                if time.monotonic() > deadline or not self._locked(key):
+                    break
+            try:
+                value = compute()
+                self._put(key, version, value, dumps, ttl)
+            finally:
+                self._unlock(key)
+            return value
+
+    def _try_lock(self, key):
+        try:
+            return self.backend.lock(key, self.owner)
+        except sqlite3.Error:
+            return True
+
+    def _locked(self, key):
+        try:
+            return self.backend.locked(key)
+        except sqlite3.Error:
+            return False
+
+    def _unlock(self, key):
+        try:
+            self.backend.unlock(key, self.owner)
+        except sqlite3.Error:
+            pass
+
+    def clear(self, namespace=""):
+        """Hapus entri satu namespace (bawaan: semua)."""
+        self.backend.clear(f"{namespace}:" if namespace else "")
+
+    def usage(self):
+        return self.backend.usage()
+
+
+class NullCache:
+    """Pengganti SharedCache saat cache bersama dinonaktifkan: selalu menghitung."""
+
+    stats = {}
+
+    def get_or_compute(self, namespace, name, version, compute, ttl=None, dumps=None, loads=None):
+        return compute()
+
+    def clear(self, namespace=""):
+        pass
+
+    def usage(self):
+        return {'entries': 0, 'bytes': 0, 'max_bytes': 0}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def shared_cache():
+    """Cache bersama proses ini (dibuat sekali, dipakai semua thread)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = NullCache() if CACHE_PATH == "off" else SharedCache(SQLiteBackend())
+    return _cache
+
+
+def get_or_compute(namespace, name, version, compute, ttl=None, dumps=pickle.dumps, loads=pickle.loads):
+    """Singkatan shared_cache().get_or_compute()."""
+    return shared_cache().get_or_compute(namespace, name, version, compute, ttl, dumps, loads)
+
+
+def digest(value):
+    """Nama entri pendek dan stabil dari kunci yang panjang (mis. sidik jari argumen)."""
+    return hashlib.blake2b(repr(value).encode(), digest_size=16).hexdigest()
+
+
+metrics.register_cache("bersama", lambda: {name: dict(counts) for name, counts in shared_cache().stats.items()})
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+# Semua lokasi penyimpanan diarahkan ke folder sementara sebelum modul
+# dashboard diimpor, agar pengujian tidak menyentuh store/ milik aplikasi
+_WORKDIR = tempfile.mkdtemp(prefix="dashboard-test-")
+for name, path in {
+    "DASHBOARD_STORE_DIR": "proyek",
+    "DASHBOARD_DB": "dashboard.sqlite3",
+    "DASHBOARD_REPORT_DIR": "laporan",
+    "DASHBOARD_DROP_DIR": "masuk",
+    "DASHBOARD_SITE_DIR": "publik",
+    "DASHBOARD_BOUNDARY_DIR": "batas",
+    "DASHBOARD_SHARED_CACHE": "cache.sqlite3",
+}.items():
+    os.environ.setdefault(name, os.path.join(_WORKDIR, path))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,67 @@
+import threading
+
+import pandas as pd
+
+import data
+
+
+def _batch(tahun, provinsi, investasi):
+    return pd.DataFrame({
+        'Tahun': [tahun],
+        'Bulan': [6],
+        'Provinsi': [provinsi],
+        'Investasi': [investasi],
+    })
+
+
+def test_cell_and_series_aggregate_batches():
+    cube = data.RollupCube()
+    cube.add(_batch(2020, 'Jawa Tengah', 10.0))
+    cube.add(_batch(2020, 'Jawa Tengah', 5.0))
+    cube.add(_batch(2021, 'Jawa Barat', 7.0))
+
+    assert cube.members('Provinsi') == ['Jawa Barat', 'Jawa Tengah']
+    series = cube.series('Tahunan', provinsi='Jawa Tengah')
+    assert series.tolist() == [15.0]
+    assert cube.series('Tahunan').sum() == 22.0
+
+
+def test_reads_return_copies():
+    cube = data.RollupCube()
+    cube.add(_batch(2020, 'Jawa Tengah', 10.0))
+    cell = cube.cell('Tahunan')
+    cell.clear()
+    members = cube.members('Provinsi')
+    members.append('Bali')
+    assert cube.cell('Tahunan')
+    assert cube.members('Provinsi') == ['Jawa Tengah']
+
+
+def test_concurrent_reads_during_add():
+    cube = data.RollupCube()
+    cube.add(_batch(2000, 'Jawa Tengah', 1.0))
+    errors = []
+    done = threading.Event()
+
+    def reader():
+        try:
+            while not done.is_set():
+                cube.series('Tahunan')
+                cube.members('Provinsi')
+                cube.region_cells('Tahunan')
+        except Exception as exc:  # pragma: no cover - hanya terjadi bila ada race
+            errors.append(exc)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for tahun in range(2001, 2031):
+            cube.add(_batch(tahun, f'Provinsi {tahun % 37}', 1.0))
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+
+    assert not errors
+    assert cube.series('Tahunan').sum() == 31.0
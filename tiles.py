@@ -0,0 +1,347 @@
+"""Batas wilayah kabupaten/kota untuk peta, disederhanakan per tingkat zoom.
+
+Pra-pemrosesan (offline, sekali setiap batas wilayah berubah):
+
+    python tiles.py batas_jateng.geojson --field NAME_2
+
+membaca GeoJSON poligon, membentuk topologi (busur/arc yang dipakai bersama oleh
+dua wilayah bertetangga hanya disimpan sekali), menyederhanakan setiap busur
+dengan Douglas-Peucker pada toleransi setara TOLERANCE_PX piksel untuk setiap
+zoom di geo.ZOOM_LEVELS, lalu menulis satu file TopoJSON terkuantisasi per zoom
+ke BOUNDARY_DIR. Karena busur bersama disederhanakan sekali, tidak ada celah
+atau tumpang tindih antarwilayah setelah penyederhanaan.
+
+Saat aplikasi berjalan, boundary_level(zoom) memuat file untuk zoom terdekat
+dari disk lokal (tanpa layanan tile eksternal) dan menyimpannya di cache proses.
+"""
+import argparse
+import json
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import geo
+
+BOUNDARY_DIR = os.environ.get(
+    "DASHBOARD_BOUNDARY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "store", "batas")
+)
+# Resolusi grid kuantisasi per sumbu (seperti `topojson -q`)
+QUANTIZATION = 1 << 16
+# Penyimpangan maksimum hasil penyederhanaan, dalam piksel layar
+TOLERANCE_PX = 0.5
+OBJECT_NAME = "kabupaten"
+
+_LEVEL_FILE = re.compile(r"^kabupaten-z(\d+)\.topojson$")
+
+
+def level_path(zoom, boundary_dir=BOUNDARY_DIR):
+    return os.path.join(boundary_dir, f"kabupaten-z{zoom}.topojson")
+
+
+def tolerance(zoom):
+    """Toleransi penyederhanaan (derajat) untuk satu tingkat zoom."""
+    return 360.0 / 2 ** zoom / geo.TILE_PX * TOLERANCE_PX
+
+
+def douglas_peucker(points, tol):
+    """Indeks titik yang dipertahankan algoritme Douglas-Peucker (kedua ujung selalu)."""
+    n = len(points)
+    if n < 3:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end] - a
+        direction = b - a
+        length = np.hypot(*direction)
+        if length == 0:
+            # Busur tertutup: jarak ke titik ujung
+            dist = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            dist = np.abs(direction[0] * inner[:, 1] - direction[1] * inner[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tol:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(keep)
+
+
+# ============= PRA-PEMROSESAN =============
+
+def _polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+class Topology:
+    """Topologi busur dari kumpulan poligon, dalam koordinat terkuantisasi.
+
+    Setiap ring dipotong di titik simpul (junction), yaitu titik yang tetangganya
+    berbeda di antara ring-ring yang melewatinya. Busur yang sama (searah atau
+    terbalik) disimpan sekali; ring merujuk busur dengan indeks i atau ~i
+    (terbalik), sesuai konvensi TopoJSON.
+    """
+
+    def __init__(self, features, field, quantization=QUANTIZATION):
+        self.ids = []
+        polygons = []
+        for feature in features:
+            parts = _polygons(feature.get('geometry'))
+            if parts:
+                self.ids.append(str(feature['properties'][field]))
+                polygons.append([[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in parts])
+
+        coords = np.concatenate([ring for parts in polygons for polygon in parts for ring in polygon])
+        self.translate = coords.min(axis=0)
+        extent = coords.max(axis=0) - self.translate
+        self.scale = np.where(extent > 0, extent / (quantization - 1), 1.0)
+        self.quantization = quantization
+
+        rings = []
+        for parts in polygons:
+            quantized = [[self._quantize(ring) for ring in polygon] for polygon in parts]
+            # Ring yang runtuh menjadi kurang dari 3 titik setelah kuantisasi dibuang
+            rings.append([
+                [outer] + [hole for hole in holes if len(hole) >= 3]
+                for outer, *holes in quantized if len(outer) >= 3
+            ])
+        junctions = self._junctions([ring for parts in rings for polygon in parts for ring in polygon])
+        self.arcs = []
+        self._arc_ids = {}
+        self.geometries = [
+            [[self._cut(ring, junctions) for ring in polygon] for polygon in parts]
+            for parts in rings
+        ]
+
+    def _quantize(self, ring):
+        q = np.rint((ring - self.translate) / self.scale).astype(np.int64)
+        # Titik berurutan yang jatuh di sel grid yang sama digabung
+        q = q[np.r_[True, np.any(np.diff(q, axis=0) != 0, axis=1)]]
+        if len(q) > 1 and np.array_equal(q[0], q[-1]):
+            q = q[:-1]
+        return q
+
+    def _key(self, q):
+        return q[:, 0] * self.quantization + q[:, 1]
+
+    def _junctions(self, rings):
+        # Titik adalah simpul bila pasangan tetangganya (tak berurutan) tidak sama
+        # di semua kemunculannya
+        keys, low, high = [], [], []
+        for ring in rings:
+            k = self._key(ring)
+            prev, nxt = np.roll(k, 1), np.roll(k, -1)
+            keys.append(k)
+            low.append(np.minimum(prev, nxt))
+            high.append(np.maximum(prev, nxt))
+        occurrences = pd.DataFrame({
+            'key': np.concatenate(keys), 'low': np.concatenate(low), 'high': np.concatenate(high)
+        })
+        distinct = occurrences.drop_duplicates().groupby('key').size()
+        return set(distinct.index[distinct > 1])
+
+    def _arc(self, points):
+        keys = tuple(self._key(points))
+        index = self._arc_ids.get(keys)
+        if index is not None:
+            return index
+        index = self._arc_ids.get(keys[::-1])
+        if index is not None:
+            return ~index
+        index = len(self.arcs)
+        self.arcs.append(points)
+        self._arc_ids[keys] = index
+        return index
+
+    def _cut(self, ring, junctions):
+        keys = self._key(ring)
+        cuts = np.flatnonzero(np.isin(keys, list(junctions)))
+        if len(cuts) == 0:
+            # Ring tanpa simpul menjadi satu busur tertutup yang dimulai dari titik
+            # terkecil, agar ring yang sama di wilayah lain (enklave) dikenali
+            closed = np.roll(ring, -int(np.argmin(keys)), axis=0)
+            return [self._arc(np.vstack([closed, closed[:1]]))]
+        rotated = np.roll(ring, -cuts[0], axis=0)
+        rotated = np.vstack([rotated, rotated[:1]])
+        bounds = list(cuts - cuts[0]) + [len(ring)]
+        return [self._arc(rotated[a:b + 1]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def to_topojson(self, tol):
+        """TopoJSON terkuantisasi dengan busur disederhanakan pada toleransi `tol` (derajat)."""
+        simplified = []
+        for arc in self.arcs:
+            points = arc * self.scale + self.translate
+            simplified.append(arc[douglas_peucker(points, tol)])
+        lengths = [len(arc) for arc in simplified]
+
+        def ring_size(ring):
+            return sum(lengths[i if i >= 0 else ~i] - 1 for i in ring) + 1
+
+        geometries = []
+        for feature_id, parts in zip(self.ids, self.geometries):
+            # Ring yang menyusut di bawah 4 titik (pulau/lubang kecil) tidak tampak di zoom ini
+            polygons = [
+                [outer] + [hole for hole in holes if ring_size(hole) >= 4]
+                for outer, *holes in parts if ring_size(outer) >= 4
+            ]
+            if polygons:
+                geometries.append({'type': 'MultiPolygon', 'id': feature_id, 'arcs': polygons})
+
+        arcs = []
+        for arc in simplified:
+            delta = np.vstack([arc[:1], np.diff(arc, axis=0)])
+            arcs.append(delta.tolist())
+        return {
+            'type': 'Topology',
+            'transform': {'scale': self.scale.tolist(), 'translate': self.translate.tolist()},
+            'objects': {OBJECT_NAME: {'type': 'GeometryCollection', 'geometries': geometries}},
+            'arcs': arcs,
+        }
+
+
+def build_levels(geojson_path, field, boundary_dir=BOUNDARY_DIR, zooms=geo.ZOOM_LEVELS):
+    """Tulis satu file TopoJSON per zoom; kembalikan {zoom: ukuran file (byte)}."""
+    with open(geojson_path, encoding="utf-8") as f:
+        features = json.load(f)['features']
+    topology = Topology(features, field)
+
+    os.makedirs(boundary_dir, exist_ok=True)
+    sizes = {}
+    for zoom in zooms:
+        path = level_path(zoom, boundary_dir)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(topology.to_topojson(tolerance(zoom)), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        sizes[zoom] = os.path.getsize(path)
+    return sizes
+
+
+# ============= PEMUATAN =============
+
+class BoundaryLevel:
+    """Batas wilayah satu tingkat zoom sebagai GeoJSON untuk lapisan choropleth.
+
+    repr() ringkas (zoom dan versi file) sehingga sidik jari cache figure tidak
+    perlu menelusuri seluruh geometri.
+    """
+
+    def __init__(self, zoom, geojson, version, bounds=None):
+        self.zoom = zoom
+        self.geojson = geojson
+        self.version = version
+        self.bounds = bounds
+        self.ids = [feature['id'] for feature in geojson['features']]
+        self._bboxes = np.array([_bbox(feature) for feature in geojson['features']]).reshape(-1, 4)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"BoundaryLevel(zoom={self.zoom}, version={self.version!r}, bounds={self.bounds!r})"
+
+    def within(self, bounds):
+        """Bagian yang bersinggungan dengan area (lat_min, lat_max, lon_min, lon_max)."""
+        lat_min, lat_max, lon_min, lon_max = bounds
+        with self._lock:
+            view = self._views.get(bounds)
+            if view is None:
+                lon0, lat0, lon1, lat1 = self._bboxes.T
+                hit = (lon1 >= lon_min) & (lon0 <= lon_max) & (lat1 >= lat_min) & (lat0 <= lat_max)
+                features = [f for f, keep in zip(self.geojson['features'], hit) if keep]
+                view = self._views[bounds] = BoundaryLevel(
+                    self.zoom, {'type': 'FeatureCollection', 'features': features}, self.version, bounds
+                )
+            return view
+
+
+def _bbox(feature):
+    points = np.array([p for polygon in feature['geometry']['coordinates'] for ring in polygon for p in ring])
+    return (*points.min(axis=0), *points.max(axis=0))
+
+
+def decode(topology, decimals=None):
+    """TopoJSON -> GeoJSON FeatureCollection; koordinat dibulatkan ke `decimals` digit."""
+    scale = np.asarray(topology['transform']['scale'])
+    translate = np.asarray(topology['transform']['translate'])
+    arcs = []
+    for arc in topology['arcs']:
+        points = np.cumsum(np.asarray(arc, dtype=np.int64).reshape(-1, 2), axis=0) * scale + translate
+        arcs.append(np.round(points, decimals) if decimals is not None else points)
+
+    def ring(indices):
+        parts = [arcs[i] if i >= 0 else arcs[~i][::-1] for i in indices]
+        return np.vstack([parts[0]] + [part[1:] for part in parts[1:]]).tolist()
+
+    features = [
+        {
+            'type': 'Feature',
+            'id': geometry['id'],
+            'properties': {},
+            'geometry': {'type': 'MultiPolygon',
+                         'coordinates': [[ring(r) for r in polygon] for polygon in geometry['arcs']]},
+        }
+        for geometry in topology['objects'][OBJECT_NAME]['geometries']
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def available_zooms(boundary_dir=BOUNDARY_DIR):
+    if not os.path.isdir(boundary_dir):
+        return []
+    return sorted(int(m.group(1)) for m in map(_LEVEL_FILE.match, os.listdir(boundary_dir)) if m)
+
+
+@st.cache_resource(show_spinner=False, max_entries=len(geo.ZOOM_LEVELS))
+def _load_level(path, zoom, mtime_ns):
+    with open(path, encoding="utf-8") as f:
+        topology = json.load(f)
+    # Presisi koordinat secukupnya untuk zoom ini (sekitar sepersepuluh piksel)
+    decimals = max(0, int(np.ceil(-np.log10(tolerance(zoom) / 5))))
+    return BoundaryLevel(zoom, decode(topology, decimals), mtime_ns)
+
+
+def boundary_level(zoom, bounds=None):
+    """Batas wilayah untuk zoom terdekat yang tersedia, atau None bila belum dibuat.
+
+    `bounds` (lihat geo.viewport) membatasi hasil ke wilayah yang terlihat.
+    """
+    zooms = available_zooms()
+    if not zooms:
+        return None
+    zoom = min(zooms, key=lambda z: abs(z - zoom))
+    path = level_path(zoom)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    level = _load_level(path, zoom, mtime_ns)
+    return level if bounds is None else level.within(bounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat file batas wilayah per zoom dari GeoJSON.")
+    parser.add_argument("geojson", help="GeoJSON poligon kabupaten/kota")
+    parser.add_argument("--field", default="NAME_2",
+                        help="properti nama wilayah; nilainya harus sama dengan kolom Kabupaten/Kota")
+    parser.add_argument("--output", default=BOUNDARY_DIR)
+    args = parser.parse_args()
+
+    for zoom, size in build_levels(args.geojson, args.field, args.output).items():
+        print(f"zoom {zoom}: {size / 1024:.1f} KB")